@@ -0,0 +1,120 @@
+"""Per-query overhead of the LangGraph and direct workflow executors.
+
+Runs the real workflow nodes against an instant in-memory LLM and wallet, so
+the timings are executor and node overhead only, then checks that both
+executors return the same results.
+
+    python benchmarks/executor_overhead.py --queries 2000
+"""
+import os
+import sys
+import time
+import argparse
+import contextlib
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.metrics.tracker import PerformanceMetrics
+from core.metrics.reporting import MonitoringDashboard
+from core.wallet import WalletRegistry
+from workflow.graph import WorkflowGraph
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+        self.response_metadata = {"token_usage": {"completion_tokens": 42}}
+
+
+class FakeLLM:
+    model_name = "fake"
+    
+    def invoke(self, query):
+        return FakeResponse(f"answer to {query}")
+
+
+class FakeTransfer:
+    transaction_hash = "0xfeed"
+    
+    def wait(self):
+        return self
+
+
+class FakeWallet:
+    def __init__(self, wallet_id):
+        self.id = wallet_id
+    
+    def transfer(self, **kwargs):
+        return FakeTransfer()
+
+
+def make_state(query, agent_result=None):
+    state = {
+        "data_request": query,
+        "consumer_wallet_id": "consumer",
+        "provider_wallet_id": "provider",
+        "metrics": PerformanceMetrics(start_time=time.time())
+    }
+    if agent_result:
+        state["agent_result"] = agent_result
+    return state
+
+
+def comparable(result):
+    """Result fields that must match between executors, minus timings and live objects"""
+    return {
+        key: value for key, value in result.items()
+        if value is not None and key not in ("metrics", "deadline")
+    }
+
+
+def run(workflow, queries):
+    """Return per-query latencies in microseconds"""
+    latencies = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for i in range(queries):
+            state = make_state(f"query {i}")
+            started = time.perf_counter()
+            workflow.execute(state)
+            latencies.append((time.perf_counter() - started) * 1e6)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare workflow executor overhead per query")
+    parser.add_argument("--queries", type=int, default=2000, help="Queries per executor (default: 2000)")
+    args = parser.parse_args()
+    MonitoringDashboard.history_limit = 1000
+    WalletRegistry.register(FakeWallet("consumer"))
+    WalletRegistry.register(FakeWallet("provider"))
+    
+    workflows = {}
+    for executor in WorkflowGraph.EXECUTORS:
+        workflows[executor] = WorkflowGraph(FakeLLM(), executor=executor)
+        workflows[executor].build()
+    
+    # Same inputs must give the same outputs on the plain, agent and failure paths
+    cases = [
+        ("plain", make_state),
+        ("agent", lambda q: make_state(q, {"success": True, "agent": "paper_researcher", "content": "agent answer"})),
+        ("failure", lambda q: {**make_state(q), "consumer_wallet_id": "unknown"})
+    ]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, build_state in cases:
+            results = [comparable(workflows[executor].execute(build_state("parity"))) for executor in WorkflowGraph.EXECUTORS]
+            if results[0] != results[1]:
+                raise SystemExit(f"Executors disagree on the {name} path: {results}")
+    print("Parity: plain, agent and failure paths match")
+    
+    for executor, workflow in workflows.items():
+        run(workflow, min(args.queries, 100))  # Warm up
+        latencies = sorted(run(workflow, args.queries))
+        print(
+            f"{executor:>10}: mean {statistics.mean(latencies):8.1f} us  "
+            f"p50 {latencies[len(latencies) // 2]:8.1f} us  "
+            f"p95 {latencies[int(len(latencies) * 0.95)]:8.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""Memory footprint of workflow state per in-flight query.
+
+Runs queries through the direct executor against an in-memory LLM and
+wallet and keeps every finished state alive, as if all of them were still
+in flight. tracemalloc then gives the retained bytes per query and the peak
+heap growth of a single query.
+
+    python benchmarks/state_footprint.py --queries 5000 --response-kb 4
+"""
+import os
+import sys
+import time
+import argparse
+import contextlib
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.metrics.tracker import PerformanceMetrics
+from core.metrics.reporting import MonitoringDashboard
+from core.wallet import WalletRegistry
+from workflow.graph import WorkflowGraph
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+        self.response_metadata = {"token_usage": {"completion_tokens": len(content) // 4}}
+
+
+class FakeLLM:
+    model_name = "fake"
+    
+    def __init__(self, response_kb):
+        self.response_kb = response_kb
+    
+    def invoke(self, query):
+        # A fresh string per call, as a real response would be
+        return FakeResponse(f"{query}: " + "x" * (self.response_kb * 1024))
+
+
+class FakeTransfer:
+    transaction_hash = "0xfeed"
+    
+    def wait(self):
+        return self
+
+
+class FakeWallet:
+    def __init__(self, wallet_id):
+        self.id = wallet_id
+    
+    def transfer(self, **kwargs):
+        return FakeTransfer()
+
+
+def make_state(query):
+    return {
+        "data_request": query,
+        "consumer_wallet_id": "consumer",
+        "provider_wallet_id": "provider",
+        "metrics": PerformanceMetrics(start_time=time.time())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure workflow state memory per in-flight query")
+    parser.add_argument("--queries", type=int, default=5000, help="Queries to keep in flight (default: 5000)")
+    parser.add_argument("--response-kb", type=int, default=4, help="Size of each response body in KB (default: 4)")
+    args = parser.parse_args()
+    
+    WalletRegistry.register(FakeWallet("consumer"))
+    WalletRegistry.register(FakeWallet("provider"))
+    # The dashboard's transaction log grows with every query; keep it out of the measurement
+    MonitoringDashboard.history_limit = 1
+    workflow = WorkflowGraph(FakeLLM(args.response_kb), executor="direct")
+    workflow.build()
+    
+    in_flight = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        workflow.execute(make_state("warm up"))
+        
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        workflow.execute(make_state("single"))
+        single_peak = tracemalloc.get_traced_memory()[1] - baseline
+        
+        baseline = tracemalloc.get_traced_memory()[0]
+        for i in range(args.queries):
+            in_flight.append(workflow.execute(make_state(f"query {i}")))
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+        tracemalloc.stop()
+    
+    per_query = retained / args.queries
+    body = args.response_kb * 1024
+    rows = [
+        ("Response body", f"{body / 1024:.1f} KB"),
+        ("Peak growth of one query", f"{single_peak / 1024:.1f} KB"),
+        ("Retained per query", f"{per_query / 1024:.1f} KB ({per_query / body:.2f}x the body)"),
+        ("Retained per query, no body", f"{(per_query - body) / 1024:.1f} KB"),
+        ("In-flight queries per GB", f"{int(1024 ** 3 / per_query)}")
+    ]
+    for label, value in rows:
+        print(f"{label + ':':<30}{value}")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,25 +1,37 @@
 import time
+import threading
+import contextvars
 from config.paths import Paths
-from core.wallet import WalletManager
+from config.yaml_config import ConfigLoader
+from core.wallet import WalletManager, ConsumerWalletPool
 from core.llm import LLMProvider
 from core.agent_manager import AgentManager
 from core.metrics.tracker import PerformanceMetrics
 from core.metrics.reporting import MonitoringDashboard
+from core.metrics.memory import MemoryTracker
+from core.deadline import Deadline
+from core.tracing import Tracer
+from core.router import ModelRouter
+from core.semantic_cache import SemanticCache
 from workflow.graph import WorkflowGraph
 from cli.output import OutputFormatter
 
 class CDPCliApp:
     def __init__(self, cdp_api_path, consumer_seed_path, provider_seed_path, 
-                 llm_provider=None, llm_model=None, agent_name=None, config_path='config.yaml'):
+                 llm_provider=None, llm_model=None, agent_name=None, config_path='config.yaml',
+                 timeout=None, auto_route=False, stream_budget=None, chunk_tokens=32,
+                 semantic_cache=False, executor="langgraph", track_memory=False):
         self.paths = Paths(
             cdp_api=cdp_api_path,
             consumer_seed=consumer_seed_path,
             provider_seed=provider_seed_path
         )
         self.consumer_wallet = None
+        self.consumer_pool = None
         self.provider_wallet = None
         self.llm = None
         self.workflow = None
+        self.workflows = {}
         self.output = OutputFormatter()
         self.llm_provider = llm_provider
         self.llm_model = llm_model
@@ -27,7 +39,18 @@ class CDPCliApp:
         self.config_path = config_path
         self.agent_manager = None
         self.use_agent = agent_name is not None
+        self.timeout = timeout
+        self.auto_route = auto_route
+        self.router = None
+        self.stream_budget = stream_budget
+        self.chunk_tokens = chunk_tokens
+        self.use_cache = semantic_cache
+        self.cache = None
+        self.executor = executor
+        if track_memory:
+            MemoryTracker.enable()
     
+    @Tracer.traced("CDPCliApp.initialize")
     def initialize(self):
         """Initialize the application"""
         try:
@@ -41,7 +64,18 @@ class CDPCliApp:
             
             # Import wallets
             print("Importing wallets...")
-            self.consumer_wallet = WalletManager.import_consumer_wallet(self.paths.consumer_seed)
+            consumer_wallets = ConfigLoader.get_consumer_wallets(self.config_path)
+            if consumer_wallets:
+                print(f"Importing consumer wallet pool ({len(consumer_wallets)} wallets)...")
+                self.consumer_pool = WalletManager.import_consumer_pool(consumer_wallets)
+                if not self.consumer_pool:
+                    return False
+                self.consumer_wallet = next(iter(self.consumer_pool.wallets.values()))
+            else:
+                self.consumer_wallet = WalletManager.import_consumer_wallet(self.paths.consumer_seed)
+                if self.consumer_wallet and self.stream_budget:
+                    # Streaming budgets are reserved on a pool, even for a single wallet
+                    self.consumer_pool = ConsumerWalletPool([self.consumer_wallet])
             self.provider_wallet = WalletManager.import_provider_wallet(self.paths.provider_seed)
             
             if not self.consumer_wallet or not self.provider_wallet:
@@ -73,9 +107,18 @@ class CDPCliApp:
             if not self.llm:
                 return False
             
+            # Route each query to a model tier instead of always using self.llm
+            if self.auto_route:
+                print("Enabling automatic model tiering...")
+                self.router = ModelRouter(config_path=self.config_path)
+            
+            if self.use_cache:
+                print("Loading semantic cache...")
+                self.cache = SemanticCache(config_path=self.config_path)
+            
             # Setup workflow
             print("Building workflow...")
-            self.workflow = WorkflowGraph(self.llm)
+            self.workflow = WorkflowGraph(self.llm, router=self.router, executor=self.executor)
             self.workflow.build()
             
             print("Initialization complete!")
@@ -84,23 +127,78 @@ class CDPCliApp:
             print(f"Initialization failed: {str(e)}")
             return False
     
-    def process_query(self, query):
-        """Process a single query"""
+    def get_workflow(self, provider=None, model=None):
+        """Get the workflow for a provider/model override, building it on first use"""
+        if provider is None and model is None:
+            return self.workflow
+        
+        key = (provider or self.llm_provider, model or self.llm_model)
+        if key not in self.workflows:
+            llm = LLMProvider.create_llm(provider=key[0], model_name=key[1], config_path=self.config_path)
+            if not llm:
+                return None
+            workflow = WorkflowGraph(llm, executor=self.executor)
+            workflow.build()
+            self.workflows[key] = workflow
+        return self.workflows[key]
+    
+    @Tracer.traced("CDPCliApp.process_query")
+    def process_query(self, query, timeout=None, agent_name=None, provider=None, model=None,
+                      prepared_response=None, payment_callback=None):
+        """Process a single query, optionally within a timeout in seconds.
+        
+        agent_name, provider and model override the app's defaults for this query only.
+        prepared_response ({"content", "tokens", "source"}) is a response generated
+        elsewhere, e.g. by a provider batch job; it is paid for and delivered without
+        running inference; with a tx_hash it has also been paid for already.
+        payment_callback is called with {"tx_hash", "wallet_id", "cost", "tokens",
+        "content", "agent"} as soon as the payment transfer is broadcast; content is
+        what will be delivered, i.e. the agent's answer if an agent produced one.
+        """
         if not self.workflow:
             print("Workflow not initialized. Run initialize() first.")
             return None
         
+        workflow = self.get_workflow(provider, model)
+        if not workflow:
+            self.output.print_error(f"Could not set up LLM {provider}/{model}")
+            return None
+        
+        agent_name = agent_name or self.agent_name
+        Tracer.annotate(agent=agent_name, provider=provider or self.llm_provider, model=model or self.llm_model)
+        if agent_name and not self.agent_manager:
+            self.agent_manager = AgentManager(config_path=self.config_path)
+        
         print(f"\n\n=== Processing Query ===\n{query}\n")
         
         # Start timing and metrics
         start_time = time.time()
-        metrics = PerformanceMetrics(start_time=start_time)
+        metrics = PerformanceMetrics(start_time=start_time, memory_baseline=MemoryTracker.begin())
+        deadline = Deadline.from_timeout(timeout if timeout is not None else self.timeout)
+        
+        # Serve near-duplicates of earlier queries from the semantic cache
+        cached = None
+        cache_key = agent_name or f"llm:{provider or self.llm_provider or 'default'}/{model or self.llm_model or 'default'}"
+        if self.cache and not prepared_response:
+            cached = self.cache.lookup(query, cache_key)
+            if cached:
+                print(f"Semantic cache hit (similarity {cached['similarity']:.3f})")
+                Tracer.annotate(cache_hit=True, similarity=cached['similarity'])
+                prepared_response = {"content": cached["content"], "tokens": cached["tokens"], "source": "cache"}
         
         # If using agent, process with agent first
         agent_result = None
-        if self.use_agent and self.agent_manager:
-            print(f"Processing with agent: {self.agent_name}...")
-            agent_result = self.agent_manager.execute_agent(self.agent_name, query)
+        if agent_name and not prepared_response:
+            print(f"Processing with agent: {agent_name}...")
+            agent_result = self.agent_manager.execute_agent(agent_name, query, deadline=deadline)
+            
+            if agent_result.get('timed_out'):
+                # No budget left to fall back on, and nothing has been paid yet
+                metrics.status = "timeout"
+                metrics.error = agent_result['content']
+                MonitoringDashboard.log_transaction(None, metrics)
+                self.output.print_error(f"Timed out: {agent_result['content']}")
+                return None
             
             if not agent_result['success']:
                 print(f"Agent execution failed: {agent_result['content']}")
@@ -110,19 +208,45 @@ class CDPCliApp:
         # Prepare state with agent result if available
         state = {
             "data_request": query,
-            "consumer_wallet": self.consumer_wallet,
-            "provider_wallet": self.provider_wallet,
-            "metrics": metrics
+            "consumer_wallet_id": self.consumer_wallet.id,
+            "provider_wallet_id": self.provider_wallet.id,
+            "consumer_pool": self.consumer_pool,
+            "metrics": metrics,
+            "deadline": deadline,
+            "payment_callback": payment_callback
         }
         
+        # Explicit provider/model overrides bypass automatic tiering
+        if self.router and workflow is self.workflow and not prepared_response:
+            agent_type = ConfigLoader.get_agent_config(agent_name, self.config_path).get('type') if agent_name else None
+            tier, score = self.router.route(query, agent_type)
+            state["route_tier"] = tier
+            print(f"Routing to {self.router.tier_name(tier)} tier (complexity {score})")
+        
+        if prepared_response:
+            state["prepared_response"] = prepared_response
+        
+        # Metered streaming: chunks are printed as they arrive and charged against the budget
+        streamed = bool(self.stream_budget) and not prepared_response
+        if streamed:
+            state["stream_budget"] = self.stream_budget
+            state["stream_chunk_tokens"] = self.chunk_tokens
+            state["stream_callback"] = self.output.print_stream_chunk
+            state["stream_cancel"] = threading.Event()
+        
         # If agent provided a result, include it in the state
         if agent_result:
             state["agent_result"] = agent_result
         
         # Process through workflow (handles payment and delivery)
-        result = self.workflow.execute(state)
+        with Tracer.span("WorkflowGraph.execute"):
+            if streamed:
+                result = self._execute_cancellable(workflow, state)
+            else:
+                result = workflow.execute(state)
         
-        if "error" in result:
+        # LangGraph returns every state key, so check the value rather than the key
+        if result.get("error"):
             self.output.print_error(result["error"])
             return None
         else:
@@ -135,18 +259,54 @@ class CDPCliApp:
             
             # Show which agent was used if applicable
             if agent_result:
-                print(f"Response generated by agent: {self.agent_name}")
-                
-            self.output.print_response_content(
-                result['data']['content'] if 'data' in result else agent_result['content']
-            )
+                print(f"Response generated by agent: {agent_name}")
+            
+            content = result['data']['content'] if 'data' in result else agent_result['content']
+            
+            # A metered stream has already been printed chunk by chunk
+            if agent_result or not streamed:
+                self.output.print_response_content(content)
+            
+            # Partial streams are not cached, since they may have been cut short
+            if self.cache and not cached and not streamed:
+                usage = result['token_usage']
+                tokens = usage.get('total', 0) if isinstance(usage, dict) else usage
+                self.cache.store(query, cache_key, content, tokens)
             return result
     
+    def _execute_cancellable(self, workflow, state):
+        """Run the workflow in the background so Ctrl+C cancels the stream but still settles"""
+        outcome = {}
+        
+        def target():
+            try:
+                outcome["result"] = workflow.execute(state)
+            except Exception as e:
+                outcome["error"] = e
+        
+        context = contextvars.copy_context()
+        worker = threading.Thread(target=context.run, args=(target,), daemon=True)
+        worker.start()
+        while worker.is_alive():
+            try:
+                worker.join(0.2)
+            except KeyboardInterrupt:
+                print("\nCancelling stream; paying only for delivered chunks...")
+                state["stream_cancel"].set()
+        
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+    
     def show_report(self, export=False):
         """Show the monitoring dashboard report"""
         report = MonitoringDashboard.generate_report()
         self.output.print_report(report)
         self.output.print_transactions(MonitoringDashboard.transactions)
         
+        if self.cache:
+            self.cache.flush()
+            self.output.print_cache_stats(self.cache.stats())
+        
         if export:
             self.output.export_report(report, MonitoringDashboard.transactions)
\ No newline at end of file
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+from collections import defaultdict
+from config.settings import LLMSettings
+from config.yaml_config import ConfigLoader
+from core.batch import create_batch_client
+from cli.ingest import parse_request_line, read_jsonl_requests, PaymentJournal
+from cli.output import OutputFormatter
+
+class BulkRunner:
+    """Runs a JSONL request file through provider batch jobs, then pays for and delivers each result.
+    
+    All batch jobs are recorded in a manifest next to the output file before
+    the first is submitted, so an interrupted run submits the jobs that are
+    still missing and resumes polling the rest instead of submitting (and
+    paying for) the same requests again. The manifest only holds job status;
+    which input lines belong to each job is written once to a separate
+    offsets file, and queries are read back from the input when needed. Requests with an agent need tool calls and are
+    processed in real time instead.
+    """
+    
+    def __init__(self, app, input_path, output_path, manifest_path=None):
+        settings = ConfigLoader.get_batch_config(app.config_path)
+        self.app = app
+        self.input_path = input_path
+        self.output_path = output_path
+        self.manifest_path = manifest_path or f"{output_path}.batches.json"
+        self.offsets_path = f"{os.path.splitext(self.manifest_path)[0]}.offsets.jsonl"
+        self.journal = PaymentJournal(f"{output_path}.payments.jsonl", input_path)
+        self._payments = {}
+        self._offsets = []
+        self.poll_interval = settings.get('poll_interval', 30)
+        self.max_requests = settings.get('max_requests', 1000)
+        self._clients = {}
+    
+    def client(self, provider, model):
+        """Get the batch client for a provider/model, creating it on first use"""
+        if (provider, model) not in self._clients:
+            self._clients[(provider, model)] = create_batch_client(provider, model, self.app.config_path)
+        return self._clients[(provider, model)]
+    
+    def resolve_model(self, request):
+        """Provider and model a request would run on in real time"""
+        config_path = self.app.config_path
+        provider = (request["provider"] or self.app.llm_provider
+                    or ConfigLoader.get_llm_provider(config_path) or LLMSettings.PROVIDER)
+        model = (request["model"] or (None if request["provider"] else self.app.llm_model)
+                 or ConfigLoader.get_llm_model(provider, config_path) or LLMSettings.MODEL_NAME)
+        return provider, model
+    
+    def load_manifest(self):
+        """Get the jobs planned by a previous run on this input, or None"""
+        if not os.path.exists(self.manifest_path) or not os.path.exists(self.offsets_path):
+            return None
+        with open(self.manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('input') != os.path.abspath(self.input_path):
+            return None
+        with open(self.offsets_path, 'r') as f:
+            self._offsets = [json.loads(line) for line in f]
+        return manifest
+    
+    def save_manifest(self, manifest):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def reset(self):
+        """Discard previous output and submitted jobs so the run starts from the top"""
+        for path in (self.output_path, self.manifest_path, self.offsets_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.journal.remove()
+    
+    def _settled(self):
+        """custom_ids that already have a line in the output file"""
+        if not os.path.exists(self.output_path):
+            return set()
+        settled = set()
+        with open(self.output_path, 'r') as f:
+            for line in f:
+                try:
+                    settled.add(json.loads(line)["custom_id"])
+                except (ValueError, KeyError):
+                    continue
+        return settled
+    
+    def plan(self):
+        """Group batchable requests by provider/model into batch jobs and record them before any is submitted"""
+        groups = defaultdict(list)
+        with open(self.input_path, 'rb') as f:
+            start = 0
+            for line in f:
+                end = start + len(line)
+                request = parse_request_line(line, end)
+                if request is not None:
+                    direct = "error" in request or request["agent"]
+                    groups[None if direct else self.resolve_model(request)].append(start)
+                start = end
+        
+        # Line 0 of the offsets file lists the real-time requests, line i + 1 those of job i
+        direct = groups.pop(None, [])
+        self._offsets = [direct]
+        manifest = {"input": os.path.abspath(self.input_path), "direct": len(direct), "jobs": []}
+        for (provider, model), starts in groups.items():
+            for first in range(0, len(starts), self.max_requests):
+                self._offsets.append(starts[first:first + self.max_requests])
+                manifest["jobs"].append({
+                    "provider": provider,
+                    "model": model,
+                    "batch_id": None,
+                    "submitted": False,
+                    "status": "planned",
+                    "requests": len(self._offsets[-1])
+                })
+        
+        # Written once; the manifest is saved last, so its existence means both are complete
+        tmp_path = f"{self.offsets_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            for starts in self._offsets:
+                f.write(json.dumps(starts) + "\n")
+        os.replace(tmp_path, self.offsets_path)
+        self.save_manifest(manifest)
+        return manifest
+    
+    def requests(self, index):
+        """Read back the requests of job index, or the real-time requests for None"""
+        starts = self._offsets[0 if index is None else index + 1]
+        return [
+            {**request, "offset": offset, "custom_id": f"req-{offset}"}
+            for offset, request in read_jsonl_requests(self.input_path, starts)
+        ]
+    
+    def submit(self, manifest):
+        """Submit every planned job that has no batch yet, e.g. after a crash mid-submit"""
+        for index, job in enumerate(manifest["jobs"]):
+            if job.get("batch_id"):
+                continue
+            chunk = self.requests(index)
+            job["batch_id"] = self.client(job["provider"], job["model"]).submit(
+                [(request["custom_id"], request["query"]) for request in chunk]
+            )
+            job["submitted"] = True
+            job["status"] = "submitted"
+            print(f"Submitted batch {job['batch_id']}: {len(chunk)} requests to {job['provider']}/{job['model']}")
+            # Record each job as soon as it exists, so a crash never resubmits it
+            self.save_manifest(manifest)
+        return manifest
+    
+    def wait(self, manifest):
+        """Poll unfinished batch jobs until all of them reach a terminal status"""
+        pending = [job for job in manifest["jobs"] if not job.get("finished")]
+        while pending:
+            for job in pending:
+                job["finished"], job["status"] = self.client(job["provider"], job["model"]).status(job["batch_id"])
+            self.save_manifest(manifest)
+            
+            pending = [job for job in pending if not job["finished"]]
+            if pending:
+                print(f"Waiting for {len(pending)} of {len(manifest['jobs'])} batch jobs...")
+                time.sleep(self.poll_interval)
+    
+    def _settle(self, request, out, batch_id=None, response=None):
+        """Pay for and deliver one request's result, and write its output line"""
+        record = {"id": request["id"], "offset": request["offset"], "custom_id": request["custom_id"]}
+        if batch_id:
+            record["batch_id"] = batch_id
+        
+        if "error" in request:
+            record.update(status="error", error=request["error"])
+        elif batch_id and response is None:
+            record.update(status="error", error="No result returned by the batch job")
+        elif response and "error" in response:
+            record.update(status="error", error=response["error"])
+        else:
+            # A batch response needs no LLM, so only real-time requests use the overrides
+            overrides = {} if response else {"provider": request["provider"], "model": request["model"]}
+            # Paid before the run was interrupted: deliver it without paying again
+            payment = self._payments.get(request["custom_id"])
+            if payment:
+                response = {**payment, "source": "replay"}
+            result = self.app.process_query(
+                request["query"],
+                agent_name=request["agent"],
+                prepared_response=response,
+                payment_callback=lambda paid: self.journal.record(request["custom_id"], paid),
+                **overrides
+            )
+            if result is None:
+                record.update(status="error", error="Query processing failed")
+            else:
+                record.update(status="ok", **OutputFormatter.to_record(result))
+        
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        os.fsync(out.fileno())
+        return record["status"] != "error"
+    
+    def run(self):
+        """Submit or resume batch jobs, wait for them, then settle every request"""
+        manifest = self.load_manifest()
+        if manifest:
+            print(f"Resuming {len(manifest['jobs'])} batch jobs from {self.manifest_path}")
+        else:
+            manifest = self.plan()
+        self.submit(manifest)
+        
+        settled = self._settled()
+        self._payments = self.journal.load()
+        processed = 0
+        failed = 0
+        with open(self.output_path, 'a') as out:
+            # Agent requests and invalid lines are handled while the batches run
+            for request in self.requests(None):
+                if request["custom_id"] not in settled:
+                    failed += not self._settle(request, out)
+                    processed += 1
+            
+            self.wait(manifest)
+            for index, job in enumerate(manifest["jobs"]):
+                if job["status"] not in ("completed", "ended"):
+                    print(f"Batch {job['batch_id']} finished with status {job['status']}")
+                results = self.client(job["provider"], job["model"]).results(job["batch_id"])
+                for request in self.requests(index):
+                    if request["custom_id"] in settled:
+                        continue
+                    response = results.get(request["custom_id"])
+                    if response and "error" not in response:
+                        response = {**response, "source": "batch", "model": job["model"]}
+                    failed += not self._settle(request, out, job["batch_id"], response)
+                    processed += 1
+        
+        # Every paid request now has its output line
+        self.journal.remove()
+        print(f"\nProcessed {processed} requests ({failed} failed) in {len(manifest['jobs'])} batch jobs, results in {self.output_path}")
+        return processed
\ No newline at end of file
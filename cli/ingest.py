@@ -0,0 +1,200 @@
+import os
+import json
+from cli.output import OutputFormatter
+
+def parse_request_line(line, offset):
+    """Parse one request line ending at a byte offset, or return None for a blank line.
+    
+    Each record has an id, a query and optional agent/provider/model overrides.
+    Lines that are not a valid JSON object or carry no query come back with an 'error' key.
+    """
+    if not line.strip():
+        return None
+    
+    try:
+        data = json.loads(line)
+    except ValueError as e:
+        return {"id": f"offset:{offset}", "error": f"Invalid JSON: {str(e)}"}
+    if not isinstance(data, dict):
+        return {"id": f"offset:{offset}", "error": f"Request line is a JSON {type(data).__name__}, not an object"}
+    
+    record = {
+        "id": data.get('id') or data.get('request_id') or f"offset:{offset}",
+        "query": data.get('query') or data.get('body'),
+        "agent": data.get('agent'),
+        "provider": data.get('provider'),
+        "model": data.get('model')
+    }
+    if not record["query"]:
+        record["error"] = "No query in request line"
+    return record
+
+
+def iter_jsonl_requests(path, start_offset=0):
+    """Lazily yield (end_offset, record) for each request line, starting at a byte offset"""
+    offset = start_offset
+    with open(path, 'rb') as f:
+        f.seek(start_offset)
+        for line in f:
+            offset += len(line)
+            record = parse_request_line(line, offset)
+            if record is not None:
+                yield offset, record
+
+
+def read_jsonl_requests(path, starts):
+    """Yield (end_offset, record) for the request lines starting at the given byte offsets"""
+    with open(path, 'rb') as f:
+        for start in starts:
+            f.seek(start)
+            line = f.readline()
+            yield start + len(line), parse_request_line(line, start + len(line))
+
+
+class PaymentJournal:
+    """Append-only record of payments sent for an input file, keyed per request.
+    
+    A payment is recorded as soon as its transfer is broadcast, so a run
+    interrupted before the request's output line is written delivers the
+    paid response on resume instead of paying again.
+    """
+    
+    def __init__(self, path, input_path):
+        self.path = path
+        self.input = os.path.abspath(input_path)
+    
+    def load(self):
+        """Map each key to the payment recorded for it on this input"""
+        payments = {}
+        if not os.path.exists(self.path):
+            return payments
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Half-written by an interrupted run
+                if entry.get("input") == self.input:
+                    payments[entry["key"]] = entry["payment"]
+        return payments
+    
+    def record(self, key, payment):
+        """Durably append the payment made for key"""
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({"input": self.input, "key": key, "payment": payment}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class JsonlIngest:
+    """Streams a JSONL request file through the app with a resumable offset checkpoint"""
+    
+    def __init__(self, app, input_path, output_path, checkpoint_path=None):
+        self.app = app
+        self.input_path = input_path
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or f"{output_path}.offset"
+        self.journal = PaymentJournal(f"{output_path}.payments.jsonl", input_path)
+    
+    def load_offset(self):
+        """Get the input offset to resume from, or 0 for a fresh run"""
+        if not os.path.exists(self.checkpoint_path):
+            return 0
+        with open(self.checkpoint_path, 'r') as f:
+            checkpoint = json.load(f)
+        # Output written for another input says nothing about this one
+        if checkpoint.get('input') != os.path.abspath(self.input_path):
+            return 0
+        
+        # A result may have been written just before a crash prevented the
+        # checkpoint from being committed; never process that line twice
+        return max(checkpoint.get('offset', 0), self._last_output_offset())
+    
+    def _last_output_offset(self):
+        """Read the input offset recorded on the last line of the output file"""
+        if not os.path.exists(self.output_path):
+            return 0
+        with open(self.output_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(size - 65536, 0))
+            lines = f.read().splitlines()
+        for line in reversed(lines):
+            try:
+                return json.loads(line).get('offset', 0)
+            except ValueError:
+                continue
+        return 0
+    
+    def _ends_with_newline(self):
+        """Whether the output file ends with a complete line"""
+        with open(self.output_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+    
+    def commit_offset(self, offset):
+        """Atomically record that everything before offset has been processed"""
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"input": os.path.abspath(self.input_path), "offset": offset}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+    
+    def reset(self):
+        """Discard previous output and checkpoint so the run starts from the top"""
+        for path in (self.output_path, self.checkpoint_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.journal.remove()
+    
+    def run(self):
+        """Process every remaining line, streaming results as they complete"""
+        start_offset = self.load_offset()
+        if start_offset:
+            print(f"Resuming {self.input_path} from byte offset {start_offset}")
+        
+        payments = self.journal.load()
+        processed = 0
+        failed = 0
+        with open(self.output_path, 'a') as out:
+            # Terminate a line left half-written by an interrupted run
+            if out.tell() and not self._ends_with_newline():
+                out.write("\n")
+            
+            for offset, request in iter_jsonl_requests(self.input_path, start_offset):
+                record = {"id": request["id"], "offset": offset}
+                
+                if "error" in request:
+                    record.update(status="error", error=request["error"])
+                else:
+                    # Paid before the run was interrupted: deliver it without paying again
+                    payment = payments.get(offset)
+                    result = self.app.process_query(
+                        request["query"],
+                        agent_name=request["agent"],
+                        provider=request["provider"],
+                        model=request["model"],
+                        prepared_response={**payment, "source": "replay"} if payment else None,
+                        payment_callback=lambda paid, key=offset: self.journal.record(key, paid)
+                    )
+                    if result is None:
+                        record.update(status="error", error="Query processing failed")
+                    else:
+                        record.update(status="ok", **OutputFormatter.to_record(result))
+                
+                # Persist the result before committing its offset
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                
+                processed += 1
+                failed += record["status"] == "error"
+                self.commit_offset(offset)
+        
+        # Every paid request now has its output line
+        self.journal.remove()
+        print(f"\nProcessed {processed} requests ({failed} failed), results in {self.output_path}")
+        return processed
\ No newline at end of file
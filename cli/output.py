@@ -16,6 +16,11 @@ class OutputFormatter:
         print("\n--- Response Content ---\n")
         print(content)
     
+    @staticmethod
+    def print_stream_chunk(chunk, tokens, accrued_cost):
+        """Print a metered stream chunk as soon as it is delivered"""
+        print(chunk, end="", flush=True)
+    
     @staticmethod
     def print_error(error):
         """Print error message"""
@@ -27,6 +32,20 @@ class OutputFormatter:
         print("\n=== Performance Report ===")
         pprint(report)
     
+    @staticmethod
+    def print_cache_stats(stats):
+        """Print semantic cache statistics"""
+        print("\n=== Semantic Cache ===")
+        pprint(stats)
+    
+    @staticmethod
+    def print_cache_evaluation(results):
+        """Print hit and false-hit rates for each candidate similarity threshold"""
+        print("\n=== Semantic Cache Threshold Evaluation ===")
+        print(f"{'threshold':>10} {'hit_rate':>10} {'recall':>10} {'false_hits':>10}")
+        for row in results:
+            print(f"{row['threshold']:>10.2f} {row['hit_rate']:>10.3f} {row['recall']:>10.3f} {row['false_hit_rate']:>10.3f}")
+    
     @staticmethod
     def print_transactions(transactions):
         """Print transaction history"""
@@ -40,6 +59,12 @@ class OutputFormatter:
                 print(f"  Time: {data['timestamp']}")
                 print(f"  Tokens: {data['tokens']}")
                 print(f"  Cost: {data['cost']:.6f} USDC")
+                if data.get('stop_reason'):
+                    print(f"  Stream stopped: {data['stop_reason']}")
+                if data.get('wallet'):
+                    print(f"  Paid by wallet: {data['wallet']}")
+                if data.get('peak_memory_kb') is not None:
+                    print(f"  Peak memory: {data['peak_memory_kb']} KB")
                 if data.get('error'):
                     print(f"  Error: {data['error']}")
     
@@ -52,4 +77,26 @@ class OutputFormatter:
         }
         with open(filename, 'w') as f:
             json.dump(data, f, indent=2)
-        print(f"\nReport exported to {filename}")
\ No newline at end of file
+        print(f"\nReport exported to {filename}")
+    
+    @staticmethod
+    def to_record(result):
+        """Reduce a workflow result to a JSON-serializable record"""
+        if not result:
+            return None
+        return {
+            "tx_hash": result.get('tx_hash'),
+            "cost": result.get('calculated_cost'),
+            "tokens": result.get('token_usage'),
+            "content": result.get('data', {}).get('content')
+        }
+    
+    @staticmethod
+    def export_results(records, filename="results.jsonl"):
+        """Write result records to a JSONL file, one per line"""
+        count = 0
+        with open(filename, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+                count += 1
+        print(f"\nExported {count} results to {filename}")
\ No newline at end of file
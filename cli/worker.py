@@ -0,0 +1,135 @@
+import os
+import time
+import socket
+import threading
+import multiprocessing
+from cli.app import CDPCliApp
+from cli.output import OutputFormatter
+from core.job_queue import JobQueue
+from core.tracing import Tracer
+
+class QueueWorker:
+    """Processes jobs from a JobQueue with one warm CDPCliApp"""
+    
+    def __init__(self, worker_id, app_kwargs, queue_path, keep_alive=False, poll_interval=1.0):
+        self.worker_id = worker_id
+        self.app_kwargs = app_kwargs
+        self.queue = JobQueue(queue_path)
+        self.keep_alive = keep_alive
+        self.poll_interval = poll_interval
+        self.app = None
+    
+    def run(self):
+        """Initialize the app once, then process jobs until the queue drains"""
+        self.app = CDPCliApp(**self.app_kwargs)
+        if not self.app.initialize():
+            print(f"[{self.worker_id}] Initialization failed. Exiting.")
+            return 0
+        
+        processed = 0
+        while True:
+            job = self.queue.claim(self.worker_id)
+            if job is None:
+                if not self.keep_alive and self.queue.pending() == 0:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+            
+            self.process_job(job)
+            processed += 1
+        
+        print(f"[{self.worker_id}] Queue drained after {processed} jobs")
+        return processed
+    
+    def heartbeat(self, job_id, stop):
+        """Renew the job's lease until stop is set, so a long query is not handed to another worker"""
+        while not stop.wait(self.queue.visibility_timeout / 3):
+            if not self.queue.renew(job_id, self.worker_id):
+                print(f"[{self.worker_id}] Lease on job {job_id[:10]}... was lost while running")
+                return
+    
+    def process_job(self, job):
+        """Run one job and record its result or failure"""
+        print(f"[{self.worker_id}] Job {job['id'][:10]}... (attempt {job['attempt']})")
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=self.heartbeat, args=(job['id'], stop), daemon=True)
+        heartbeat.start()
+        try:
+            payload = job['payload']
+            # An earlier attempt already paid: deliver what was paid for instead of paying again
+            prepared = {**job['payment'], "source": "replay"} if job['payment'] else None
+            result = self.app.process_query(
+                payload['query'],
+                agent_name=payload.get('agent'),
+                provider=payload.get('provider'),
+                model=payload.get('model'),
+                prepared_response=prepared,
+                payment_callback=lambda payment: self.queue.record_payment(job['id'], payment)
+            )
+        except Exception as e:
+            self.queue.fail(job['id'], self.worker_id, str(e))
+            return
+        finally:
+            stop.set()
+            heartbeat.join()
+        
+        if result is None:
+            self.queue.fail(job['id'], self.worker_id, "Query processing failed")
+        elif not self.queue.complete(job['id'], self.worker_id, OutputFormatter.to_record(result)):
+            print(f"[{self.worker_id}] Lease on job {job['id'][:10]}... was lost before completion")
+
+
+def worker_trace_path(trace_path, worker_id):
+    """Trace file of one worker: trace.json becomes trace.<worker_id>.json"""
+    root, ext = os.path.splitext(trace_path)
+    return f"{root}.{worker_id}{ext or '.json'}"
+
+
+def run_worker(worker_id, app_kwargs, queue_path, keep_alive=False, trace=None):
+    """Process entry point for a queue worker.
+    
+    trace is (path, sample_rate, max_spans); spawned workers start with
+    tracing off, so each one enables it and exports its own trace file.
+    """
+    if trace:
+        Tracer.enable(sample_rate=trace[1], max_events=trace[2])
+    try:
+        return QueueWorker(worker_id, app_kwargs, queue_path, keep_alive=keep_alive).run()
+    finally:
+        if trace:
+            Tracer.export(worker_trace_path(trace[0], worker_id))
+
+
+class WorkerPool:
+    """Runs several QueueWorker processes against the same queue"""
+    
+    def __init__(self, num_workers, app_kwargs, queue_path, keep_alive=False, trace=None):
+        self.num_workers = num_workers
+        self.app_kwargs = app_kwargs
+        self.queue_path = queue_path
+        self.keep_alive = keep_alive
+        self.trace = trace
+    
+    def run(self):
+        """Start the workers and wait for all of them to exit"""
+        # Make the queue exist before workers race to create it
+        JobQueue(self.queue_path)
+        
+        # Spawn rather than fork so no SDK client or lock state is inherited
+        context = multiprocessing.get_context("spawn")
+        host = socket.gethostname()
+        processes = []
+        for index in range(self.num_workers):
+            worker_id = f"{host}-{os.getpid()}-{index}"
+            process = context.Process(
+                target=run_worker,
+                args=(worker_id, self.app_kwargs, self.queue_path, self.keep_alive, self.trace),
+                name=worker_id
+            )
+            process.start()
+            processes.append(process)
+        
+        for process in processes:
+            process.join()
+        
+        return [process.exitcode for process in processes]
\ No newline at end of file
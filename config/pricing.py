@@ -1,8 +1,25 @@
 class PricingConfig:
     COST_PER_TOKEN = 0.000001  # $0.000001 per token
     MINIMUM_FEE = 0.00001      # $0.00001 minimum
+    CACHE_HIT_COST_PER_TOKEN = 0.0000002  # Responses served from the semantic cache
+    BATCH_COST_PER_TOKEN = 0.0000005  # Responses generated by offline provider batch jobs
     
     @classmethod
     def calculate_cost(cls, tokens):
         """Calculate cost based on token count"""
-        return max(tokens * cls.COST_PER_TOKEN, cls.MINIMUM_FEE)
\ No newline at end of file
+        return max(tokens * cls.COST_PER_TOKEN, cls.MINIMUM_FEE)
+    
+    @classmethod
+    def calculate_cache_hit_cost(cls, tokens):
+        """Calculate the reduced cost of a response served from the semantic cache"""
+        return max(tokens * cls.CACHE_HIT_COST_PER_TOKEN, cls.MINIMUM_FEE)
+    
+    @classmethod
+    def calculate_batch_cost(cls, tokens):
+        """Calculate the discounted cost of a response generated by a provider batch job"""
+        return max(tokens * cls.BATCH_COST_PER_TOKEN, cls.MINIMUM_FEE)
+    
+    @classmethod
+    def max_tokens_for_budget(cls, budget):
+        """Calculate how many tokens a pre-authorized budget covers"""
+        return int(budget / cls.COST_PER_TOKEN)
\ No newline at end of file
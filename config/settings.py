@@ -8,4 +8,5 @@ class WalletSettings:
     CONSUMER_WALLET_ID = '3e4c9f11-18a3-4905-a474-777909c5736d'
     PROVIDER_WALLET_ID = 'e5b34cf5-df25-4ceb-8b81-8d0036f7d8ef'
     ASSET_ID = "usdc"
-    GASLESS = False
\ No newline at end of file
+    GASLESS = False
+    BALANCE_REFRESH_SECONDS = 300  # How long a pooled wallet's cached balance is trusted
\ No newline at end of file
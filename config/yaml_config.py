@@ -47,6 +47,30 @@ class ConfigLoader:
         config = cls.load_config(config_path)
         return config.get('wallet', {})
     
+    @classmethod
+    def get_consumer_wallets(cls, config_path='config.yaml'):
+        """Get the consumer wallet pool (list of {id, seed}) from config"""
+        config = cls.load_config(config_path)
+        return config.get('wallet', {}).get('consumers', []) or []
+    
+    @classmethod
+    def get_routing_config(cls, config_path='config.yaml'):
+        """Get model tiering settings from config"""
+        config = cls.load_config(config_path)
+        return config.get('routing', {})
+    
+    @classmethod
+    def get_semantic_cache_config(cls, config_path='config.yaml'):
+        """Get semantic response cache settings from config"""
+        config = cls.load_config(config_path)
+        return config.get('semantic_cache', {})
+    
+    @classmethod
+    def get_batch_config(cls, config_path='config.yaml'):
+        """Get offline bulk (provider batch API) settings from config"""
+        config = cls.load_config(config_path)
+        return config.get('batch', {})
+    
     @classmethod
     def get_paths(cls, config_path='config.yaml'):
         """Get paths from config"""
@@ -6,6 +6,8 @@ from langchain_groq import ChatGroq
 from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 from config.yaml_config import ConfigLoader
+from core.deadline import DeadlineExceeded, call_with_deadline
+from core.tracing import Tracer
 
 
 class AgentManager:
@@ -144,18 +146,28 @@ class AgentManager:
                 'type': 'basic'
             }
     
-    def execute_agent(self, agent_name, query):
-        """Execute an agent with the provided query"""
+    @Tracer.traced("AgentManager.execute_agent")
+    def execute_agent(self, agent_name, query, deadline=None):
+        """Execute an agent with the provided query, within an optional deadline"""
         agent_data = self.create_agent(agent_name)
         agent = agent_data['agent']
+        Tracer.annotate(agent=agent_data['name'], type=agent_data['type'])
         
         try:
-            result = agent.invoke({"request": query})
+            result = call_with_deadline(deadline, "agent execution", agent.invoke, {"request": query})
             return {
                 'content': result,
                 'agent': agent_data['name'],
                 'success': True
             }
+        except DeadlineExceeded as e:
+            print(f"Agent timed out: {str(e)}")
+            return {
+                'content': str(e),
+                'agent': agent_data['name'],
+                'success': False,
+                'timed_out': True
+            }
         except Exception as e:
             error_message = f"Error executing agent: {str(e)}"
             print(error_message)
@@ -0,0 +1,117 @@
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from cdp import Wallet, Cdp
+from config.settings import WalletSettings
+from core.tracing import Tracer
+
+def resize_connection_pool(maxsize):
+    """Let the CDP HTTP client keep up to maxsize keep-alive connections per host.
+    
+    The SDK's urllib3 pool defaults to five connections per CPU; extra
+    concurrent requests would open and discard connections instead of
+    reusing them. Returns False if the SDK is not configured yet.
+    """
+    api_clients = getattr(Cdp, "api_clients", None)
+    cdp_client = getattr(api_clients, "_cdp_client", None)
+    rest_client = getattr(cdp_client, "rest_client", None)
+    pool_manager = getattr(rest_client, "pool_manager", None)
+    if pool_manager is None:
+        return False
+    
+    pool_manager.connection_pool_kw["maxsize"] = maxsize
+    pool_manager.clear()  # Pools are recreated with the new size on next use
+    return True
+
+
+class AsyncWalletClient:
+    """Async facade over CDP wallet fetch, balance, transfer and confirmation polling"""
+    
+    def __init__(self, max_in_flight=64, max_workers=None, poll_interval=0.5):
+        """Bound concurrent CDP requests and run blocking SDK calls on a dedicated executor"""
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or max_in_flight,
+            thread_name_prefix="cdp-wallet"
+        )
+        self._semaphore = None
+        if not resize_connection_pool(max_in_flight):
+            print("Warning: CDP is not configured yet; HTTP connection pool left at its default size")
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+    
+    def close(self):
+        """Shut down the executor"""
+        self._executor.shutdown(wait=False)
+    
+    async def _call(self, func, *args, **kwargs):
+        """Run a blocking SDK call on the executor, holding one in-flight slot"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+    
+    async def fetch_wallet(self, wallet_id, seed_file=None):
+        """Fetch a wallet and optionally load its seed"""
+        wallet = await self._call(Wallet.fetch, wallet_id)
+        if seed_file:
+            await self._call(wallet.load_seed_from_file, seed_file)
+        return wallet
+    
+    async def balance(self, wallet, asset_id=None):
+        """Get a wallet's balance of an asset"""
+        balance = await self._call(wallet.balance, asset_id or WalletSettings.ASSET_ID)
+        return float(balance)
+    
+    async def transfer(self, wallet, amount, destination, asset_id=None, gasless=None):
+        """Submit a transfer without waiting for it to land onchain"""
+        return await self._call(
+            wallet.transfer,
+            amount=amount,
+            asset_id=asset_id or WalletSettings.ASSET_ID,
+            destination=destination,
+            gasless=WalletSettings.GASLESS if gasless is None else gasless
+        )
+    
+    async def wait_for_confirmation(self, transfer, timeout=20):
+        """Poll a transfer until it reaches a terminal state.
+        
+        Waiting between polls happens on the event loop, so a pending transfer
+        holds neither a thread nor an in-flight slot.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        while not transfer.terminal_state:
+            if loop.time() - started > timeout:
+                raise TimeoutError("Timed out waiting for Transfer to land onchain")
+            await asyncio.sleep(self.poll_interval)
+            await self._call(transfer.reload)
+        return transfer
+    
+    async def pay(self, wallet, amount, destination, timeout=20):
+        """Transfer amount and wait for confirmation"""
+        with Tracer.span("AsyncWalletClient.pay", wallet_id=wallet.id, amount=amount) as span:
+            transfer = await self.transfer(wallet, amount, destination)
+            transfer = await self.wait_for_confirmation(transfer, timeout=timeout)
+            span.set(tx_hash=transfer.transaction_hash, status=transfer.status)
+            return transfer
+    
+    async def pay_many(self, payments, timeout=20):
+        """Run many (wallet, amount, destination) payments concurrently.
+        
+        Returns one Transfer or exception per payment, in order.
+        """
+        return await asyncio.gather(
+            *(self.pay(wallet, amount, destination, timeout=timeout) for wallet, amount, destination in payments),
+            return_exceptions=True
+        )
\ No newline at end of file
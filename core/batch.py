@@ -0,0 +1,217 @@
+import os
+import abc
+import json
+import uuid
+import urllib.error
+import urllib.request
+from config.settings import LLMSettings
+from config.yaml_config import ConfigLoader
+
+class BatchError(Exception):
+    """A batch API request failed"""
+
+
+class BatchClient(abc.ABC):
+    """Submits chat requests as one asynchronous provider batch job and collects the results"""
+    
+    API_KEY_ENV = None
+    
+    def __init__(self, base_url, model, api_key=None, max_tokens=None, temperature=None, timeout=60):
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.api_key = api_key if api_key is not None else os.environ.get(self.API_KEY_ENV, "")
+        self.max_tokens = max_tokens or LLMSettings.MAX_TOKENS
+        self.temperature = LLMSettings.TEMPERATURE if temperature is None else temperature
+        self.timeout = timeout
+    
+    def _headers(self):
+        return {}
+    
+    def _request(self, method, path, body=None, content_type="application/json"):
+        """Send a request to the batch API and return the raw response body"""
+        url = path if path.startswith("http") else f"{self.base_url}{path}"
+        if body is not None and content_type == "application/json":
+            body = json.dumps(body).encode('utf-8')
+        
+        request = urllib.request.Request(url, data=body, method=method, headers=self._headers())
+        if body is not None:
+            request.add_header("Content-Type", content_type)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read()
+        except urllib.error.HTTPError as e:
+            raise BatchError(f"{method} {url} failed with {e.code}: {e.read().decode('utf-8', 'replace')}")
+        except urllib.error.URLError as e:
+            raise BatchError(f"{method} {url} failed: {e.reason}")
+    
+    def _json(self, method, path, body=None, content_type="application/json"):
+        return json.loads(self._request(method, path, body, content_type))
+    
+    @staticmethod
+    def _jsonl(raw):
+        return [json.loads(line) for line in raw.decode('utf-8').splitlines() if line.strip()]
+    
+    @abc.abstractmethod
+    def submit(self, requests):
+        """Submit (custom_id, query) pairs as one batch job and return its id"""
+    
+    @abc.abstractmethod
+    def status(self, batch_id):
+        """Return (finished, status) for a batch job"""
+    
+    @abc.abstractmethod
+    def results(self, batch_id):
+        """Map each custom_id to {"content", "tokens"}, or {"error"} if that request failed"""
+
+
+class OpenAIBatchClient(BatchClient):
+    """OpenAI-compatible Batch API (OpenAI, Groq): upload a JSONL file, create a batch, download output"""
+    
+    API_KEY_ENV = "OPENAI_API_KEY"
+    TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+    
+    def __init__(self, base_url, model, completion_window="24h", **kwargs):
+        super().__init__(base_url, model, **kwargs)
+        self.completion_window = completion_window
+    
+    def _headers(self):
+        return {"Authorization": f"Bearer {self.api_key}"}
+    
+    def _upload(self, filename, content):
+        """Upload a batch input file as multipart/form-data and return its file id"""
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"purpose\"\r\n\r\nbatch\r\n"
+            f"--{boundary}\r\n"
+            f"Content-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+            f"Content-Type: application/jsonl\r\n\r\n"
+        ).encode('utf-8') + content + f"\r\n--{boundary}--\r\n".encode('utf-8')
+        return self._json("POST", "/files", body, f"multipart/form-data; boundary={boundary}")["id"]
+    
+    def submit(self, requests):
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": [{"role": "user", "content": query}],
+                    "max_tokens": self.max_tokens,
+                    "temperature": self.temperature
+                }
+            })
+            for custom_id, query in requests
+        ]
+        file_id = self._upload("batch_input.jsonl", "\n".join(lines).encode('utf-8'))
+        batch = self._json("POST", "/batches", {
+            "input_file_id": file_id,
+            "endpoint": "/v1/chat/completions",
+            "completion_window": self.completion_window
+        })
+        return batch["id"]
+    
+    def status(self, batch_id):
+        batch = self._json("GET", f"/batches/{batch_id}")
+        return batch["status"] in self.TERMINAL_STATUSES, batch["status"]
+    
+    def results(self, batch_id):
+        batch = self._json("GET", f"/batches/{batch_id}")
+        lines = []
+        for key in ("output_file_id", "error_file_id"):
+            if batch.get(key):
+                lines += self._jsonl(self._request("GET", f"/files/{batch[key]}/content"))
+        
+        results = {}
+        for line in lines:
+            response = line.get("response") or {}
+            body = response.get("body") or {}
+            if line.get("error") or response.get("status_code") != 200:
+                error = line.get("error") or body.get("error") or f"HTTP {response.get('status_code')}"
+                results[line["custom_id"]] = {"error": error.get("message", str(error)) if isinstance(error, dict) else str(error)}
+                continue
+            results[line["custom_id"]] = {
+                "content": body["choices"][0]["message"]["content"],
+                "tokens": body.get("usage", {}).get("completion_tokens", 0)
+            }
+        return results
+
+
+class GroqBatchClient(OpenAIBatchClient):
+    """Groq's OpenAI-compatible Batch API"""
+    
+    API_KEY_ENV = "GROQ_API_KEY"
+
+
+class AnthropicBatchClient(BatchClient):
+    """Anthropic Message Batches API: requests are posted inline, results fetched from results_url"""
+    
+    API_KEY_ENV = "ANTHROPIC_API_KEY"
+    API_VERSION = "2023-06-01"
+    
+    def _headers(self):
+        return {"x-api-key": self.api_key, "anthropic-version": self.API_VERSION}
+    
+    def submit(self, requests):
+        batch = self._json("POST", "/messages/batches", {
+            "requests": [
+                {
+                    "custom_id": custom_id,
+                    "params": {
+                        "model": self.model,
+                        "max_tokens": self.max_tokens,
+                        "temperature": self.temperature,
+                        "messages": [{"role": "user", "content": query}]
+                    }
+                }
+                for custom_id, query in requests
+            ]
+        })
+        return batch["id"]
+    
+    def status(self, batch_id):
+        batch = self._json("GET", f"/messages/batches/{batch_id}")
+        return batch["processing_status"] == "ended", batch["processing_status"]
+    
+    def results(self, batch_id):
+        batch = self._json("GET", f"/messages/batches/{batch_id}")
+        # A batch canceled or expired before any request finished has no results
+        if not batch.get("results_url"):
+            return {}
+        
+        results = {}
+        for line in self._jsonl(self._request("GET", batch["results_url"])):
+            result = line.get("result") or {}
+            if result.get("type") != "succeeded":
+                error = result.get("error") or {}
+                results[line["custom_id"]] = {"error": error.get("message") or f"Request {result.get('type', 'failed')}"}
+                continue
+            message = result["message"]
+            results[line["custom_id"]] = {
+                "content": "".join(block.get("text", "") for block in message["content"] if block.get("type") == "text"),
+                "tokens": message.get("usage", {}).get("output_tokens", 0)
+            }
+        return results
+
+
+BATCH_CLIENTS = {
+    "openai": OpenAIBatchClient,
+    "groq": GroqBatchClient,
+    "anthropic": AnthropicBatchClient
+}
+
+def create_batch_client(provider, model, config_path='config.yaml'):
+    """Create a batch client for a provider, using the endpoint from the batch section of config"""
+    if provider not in BATCH_CLIENTS:
+        raise ValueError(f"Provider '{provider}' has no batch API, expected one of {list(BATCH_CLIENTS)}")
+    
+    settings = ConfigLoader.get_batch_config(config_path)
+    endpoints = settings.get('endpoints', {}) or {}
+    if not endpoints.get(provider):
+        raise ValueError(f"No batch endpoint configured for provider '{provider}'")
+    
+    kwargs = {}
+    if provider != "anthropic":
+        kwargs["completion_window"] = settings.get('completion_window', "24h")
+    return BATCH_CLIENTS[provider](endpoints[provider], model, **kwargs)
\ No newline at end of file
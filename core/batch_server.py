@@ -0,0 +1,252 @@
+"""Local stand-in for the OpenAI-compatible and Anthropic batch APIs.
+
+Lets bulk mode run end to end without provider accounts: point the
+endpoints in the batch section of config.yaml at this server.
+
+    python -m core.batch_server --port 8765 --delay 5
+"""
+import re
+import json
+import time
+import email
+import argparse
+import itertools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def echo_responder(model, prompt):
+    """Deterministic stand-in completion for a prompt"""
+    return f"[{model}] Batch response to: {prompt}"
+
+
+class BatchStore:
+    """In-memory files and batch jobs; a job completes delay seconds after it is created"""
+    
+    def __init__(self, delay=2.0, responder=echo_responder):
+        self.delay = delay
+        self.responder = responder
+        self.files = {}
+        self.batches = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+    
+    def new_id(self, prefix):
+        with self._lock:
+            return f"{prefix}_{next(self._ids)}"
+    
+    def add_file(self, content):
+        file_id = self.new_id("file")
+        self.files[file_id] = content
+        return file_id
+    
+    def ready(self, batch):
+        return time.time() - batch["created_at"] >= self.delay
+    
+    def complete(self, prompt, model):
+        """Return (content, completion_tokens), or raise ValueError for an unusable request"""
+        if not prompt or not prompt.strip():
+            raise ValueError("messages: prompt must not be empty")
+        content = self.responder(model, prompt)
+        return content, max(1, len(content) // 4)
+    
+    def openai_batch(self, batch_id):
+        """Current view of an OpenAI-format batch, producing its output file once ready"""
+        batch = self.batches[batch_id]
+        if batch["status"] == "in_progress" and self.ready(batch):
+            output, errors = [], []
+            for line in self.files[batch["input_file_id"]].decode('utf-8').splitlines():
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                body = request.get("body", {})
+                prompt = "".join(m.get("content", "") for m in body.get("messages", []) if m.get("role") == "user")
+                try:
+                    content, tokens = self.complete(prompt, body.get("model"))
+                except ValueError as e:
+                    errors.append({
+                        "id": self.new_id("batch_req"),
+                        "custom_id": request["custom_id"],
+                        "response": {"status_code": 400, "body": {"error": {"message": str(e)}}},
+                        "error": None
+                    })
+                    continue
+                output.append({
+                    "id": self.new_id("batch_req"),
+                    "custom_id": request["custom_id"],
+                    "response": {
+                        "status_code": 200,
+                        "body": {
+                            "model": body.get("model"),
+                            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                            "usage": {"prompt_tokens": max(1, len(prompt) // 4), "completion_tokens": tokens}
+                        }
+                    },
+                    "error": None
+                })
+            batch["output_file_id"] = self.add_file("\n".join(json.dumps(line) for line in output).encode('utf-8'))
+            if errors:
+                batch["error_file_id"] = self.add_file("\n".join(json.dumps(line) for line in errors).encode('utf-8'))
+            batch["request_counts"] = {"total": len(output) + len(errors), "completed": len(output), "failed": len(errors)}
+            batch["status"] = "completed"
+            batch["completed_at"] = int(time.time())
+        return batch
+    
+    def anthropic_batch(self, batch_id, base_url):
+        """Current view of an Anthropic message batch, producing its results once ready"""
+        batch = self.batches[batch_id]
+        if batch["processing_status"] == "in_progress" and self.ready(batch):
+            results = []
+            for request in batch.pop("_requests"):
+                params = request.get("params", {})
+                prompt = "".join(m.get("content", "") for m in params.get("messages", []) if m.get("role") == "user")
+                try:
+                    content, tokens = self.complete(prompt, params.get("model"))
+                except ValueError as e:
+                    results.append({
+                        "custom_id": request["custom_id"],
+                        "result": {"type": "errored", "error": {"type": "invalid_request_error", "message": str(e)}}
+                    })
+                    continue
+                results.append({
+                    "custom_id": request["custom_id"],
+                    "result": {
+                        "type": "succeeded",
+                        "message": {
+                            "id": self.new_id("msg"),
+                            "type": "message",
+                            "role": "assistant",
+                            "model": params.get("model"),
+                            "content": [{"type": "text", "text": content}],
+                            "stop_reason": "end_turn",
+                            "usage": {"input_tokens": max(1, len(prompt) // 4), "output_tokens": tokens}
+                        }
+                    }
+                })
+            batch["_results"] = "\n".join(json.dumps(line) for line in results).encode('utf-8')
+            succeeded = sum(line["result"]["type"] == "succeeded" for line in results)
+            batch["request_counts"] = {"processing": 0, "succeeded": succeeded, "errored": len(results) - succeeded}
+            batch["processing_status"] = "ended"
+            batch["results_url"] = f"{base_url}/v1/messages/batches/{batch_id}/results"
+        return {key: value for key, value in batch.items() if not key.startswith("_")}
+
+
+class BatchRequestHandler(BaseHTTPRequestHandler):
+    """Routes batch API paths; anything before /v1 (e.g. Groq's /openai prefix) is ignored"""
+    
+    store = None
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def _send(self, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _not_found(self):
+        self._send(404, {"error": {"type": "not_found_error", "message": f"No route for {self.path}"}})
+    
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+    
+    def _path(self):
+        match = re.search(r"/v1(/.*)$", self.path.split("?")[0])
+        return match.group(1) if match else self.path
+    
+    def _base_url(self):
+        return f"http://{self.headers.get('Host', '%s:%s' % self.server.server_address[:2])}"
+    
+    def do_POST(self):
+        path = self._path()
+        if path == "/files":
+            # Parse the multipart upload with the email parser to avoid the deprecated cgi module
+            message = email.message_from_bytes(
+                f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode('utf-8') + self._body()
+            )
+            content = next(
+                (part.get_payload(decode=True) for part in message.get_payload() if part.get_param("name", header="content-disposition") == "file"),
+                None
+            )
+            if content is None:
+                return self._send(400, {"error": {"message": "No file in upload"}})
+            file_id = self.store.add_file(content)
+            return self._send(200, {"id": file_id, "object": "file", "bytes": len(content), "purpose": "batch"})
+        
+        data = json.loads(self._body() or b"{}")
+        if path == "/batches":
+            if data.get("input_file_id") not in self.store.files:
+                return self._send(400, {"error": {"message": "Unknown input_file_id"}})
+            batch_id = self.store.new_id("batch")
+            self.store.batches[batch_id] = {
+                "id": batch_id,
+                "object": "batch",
+                "endpoint": data.get("endpoint"),
+                "input_file_id": data["input_file_id"],
+                "completion_window": data.get("completion_window"),
+                "status": "in_progress",
+                "created_at": time.time()
+            }
+            return self._send(200, self.store.openai_batch(batch_id))
+        if path == "/messages/batches":
+            batch_id = self.store.new_id("msgbatch")
+            self.store.batches[batch_id] = {
+                "id": batch_id,
+                "type": "message_batch",
+                "processing_status": "in_progress",
+                "created_at": time.time(),
+                "results_url": None,
+                "_requests": data.get("requests", [])
+            }
+            return self._send(200, self.store.anthropic_batch(batch_id, self._base_url()))
+        self._not_found()
+    
+    def do_GET(self):
+        path = self._path()
+        match = re.fullmatch(r"/files/([^/]+)/content", path)
+        if match and match.group(1) in self.store.files:
+            return self._send(200, self.store.files[match.group(1)], "application/jsonl")
+        match = re.fullmatch(r"/batches/([^/]+)", path)
+        if match and match.group(1) in self.store.batches:
+            return self._send(200, self.store.openai_batch(match.group(1)))
+        match = re.fullmatch(r"/messages/batches/([^/]+)(/results)?", path)
+        if match and match.group(1) in self.store.batches:
+            batch = self.store.anthropic_batch(match.group(1), self._base_url())
+            if not match.group(2):
+                return self._send(200, batch)
+            if batch["processing_status"] != "ended":
+                return self._send(404, {"error": {"message": "Batch has not ended yet"}})
+            return self._send(200, self.store.batches[match.group(1)]["_results"], "application/jsonl")
+        self._not_found()
+
+
+def create_server(host="127.0.0.1", port=8765, delay=2.0, responder=echo_responder):
+    """Create (but do not start) a stand-in batch server"""
+    handler = type("Handler", (BatchRequestHandler,), {"store": BatchStore(delay, responder)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for provider batch APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=2.0, help="Seconds before a submitted batch completes (default: 2)")
+    args = parser.parse_args()
+    
+    server = create_server(args.host, args.port, args.delay)
+    print(f"Batch server listening on http://{args.host}:{args.port}")
+    print(f"  OpenAI/Groq endpoint: http://{args.host}:{args.port}/v1")
+    print(f"  Anthropic endpoint:   http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,92 @@
+import time
+import threading
+import contextvars
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a query runs out of its time budget"""
+
+
+class PaymentPending(DeadlineExceeded):
+    """Raised when a broadcast transfer is not confirmed before the deadline"""
+    
+    def __init__(self, message, tx_hash, wallet):
+        super().__init__(message)
+        self.tx_hash = tx_hash
+        self.wallet = wallet
+
+
+class Deadline:
+    """Time budget for a single query, shared by every workflow step"""
+    
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.expires_at = time.monotonic() + timeout
+    
+    @classmethod
+    def from_timeout(cls, timeout):
+        """Create a deadline, or None when no timeout is set"""
+        return cls(timeout) if timeout else None
+    
+    def remaining(self):
+        """Seconds left in the budget"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+    
+    def expired(self):
+        """Whether the budget has run out"""
+        return self.remaining() <= 0
+    
+    def check(self, stage):
+        """Raise DeadlineExceeded if the budget ran out before a stage starts"""
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline of {self.timeout}s exceeded before {stage}")
+
+
+def invoke_with_deadline(llm, deadline, stage, input):
+    """Invoke a chat model with the remaining budget as its request timeout.
+    
+    The provider client aborts the HTTP request itself, so nothing keeps
+    running once the deadline passes.
+    """
+    if deadline is None:
+        return llm.invoke(input)
+    
+    deadline.check(stage)
+    try:
+        return llm.invoke(input, timeout=deadline.remaining())
+    except Exception as e:
+        if deadline.expired():
+            raise DeadlineExceeded(f"{stage} did not finish within the {deadline.timeout}s deadline") from e
+        raise
+
+
+def call_with_deadline(deadline, stage, func, *args, **kwargs):
+    """Call func, giving up once the deadline passes.
+    
+    Blocking calls that take no timeout cannot be interrupted, so the call runs
+    on a daemon thread that is abandoned on timeout and its result discarded.
+    Only use this for calls without side effects; an abandoned payment would
+    still go through.
+    """
+    if deadline is None:
+        return func(*args, **kwargs)
+    
+    deadline.check(stage)
+    outcome = {}
+    
+    def target():
+        try:
+            outcome["result"] = func(*args, **kwargs)
+        except BaseException as e:
+            outcome["error"] = e
+    
+    # Run in a copy of the caller's context so tracing spans keep their parent
+    context = contextvars.copy_context()
+    worker = threading.Thread(target=context.run, args=(target,), name=f"deadline-{stage}", daemon=True)
+    worker.start()
+    worker.join(deadline.remaining())
+    
+    if worker.is_alive():
+        raise DeadlineExceeded(f"{stage} did not finish within the {deadline.timeout}s deadline")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["result"]
\ No newline at end of file
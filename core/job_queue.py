@@ -0,0 +1,183 @@
+import hashlib
+import json
+import sqlite3
+import time
+from contextlib import closing
+
+
+class JobQueue:
+    """Durable SQLite job queue with visibility timeouts and idempotency keys"""
+    
+    def __init__(self, db_path='jobs.db', visibility_timeout=600, max_attempts=3):
+        """Open (and create if needed) the queue database"""
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._init_db()
+    
+    def _connect(self):
+        """Open a connection in autocommit mode so transactions are explicit"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+    
+    def _init_db(self):
+        """Create the jobs table"""
+        with closing(self._connect()) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    visible_at REAL NOT NULL,
+                    lease_owner TEXT,
+                    result TEXT,
+                    payment TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, visible_at)")
+            
+            # Queues created before payments were recorded
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if "payment" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN payment TEXT")
+    
+    @staticmethod
+    def make_key(payload):
+        """Derive a stable idempotency key from a job payload"""
+        encoded = json.dumps(payload, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+    
+    def enqueue(self, payload, idempotency_key=None):
+        """Add a job unless one with the same idempotency key already exists"""
+        job_id = idempotency_key or self.make_key(payload)
+        now = time.time()
+        with closing(self._connect()) as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO jobs (id, payload, visible_at, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, json.dumps(payload), now, now)
+            ).rowcount
+        return job_id, bool(inserted)
+    
+    def claim(self, worker_id):
+        """Lease the oldest visible job to a worker, or return None if there is none"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            
+            # Jobs whose lease expired too many times are not retried again
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', error = COALESCE(error, 'Visibility timeout exceeded') "
+                "WHERE status = 'running' AND visible_at <= ? AND attempts >= ?",
+                (now, self.max_attempts)
+            )
+            
+            row = conn.execute(
+                "SELECT id, payload, attempts, payment FROM jobs "
+                "WHERE status IN ('queued', 'running') AND visible_at <= ? "
+                "ORDER BY created_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            
+            job_id, payload, attempts, payment = row
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = ?, visible_at = ?, lease_owner = ? WHERE id = ?",
+                (attempts + 1, now + self.visibility_timeout, worker_id, job_id)
+            )
+            conn.execute("COMMIT")
+            return {
+                "id": job_id,
+                "payload": json.loads(payload),
+                "attempt": attempts + 1,
+                "payment": json.loads(payment) if payment else None
+            }
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+    
+    def renew(self, job_id, worker_id):
+        """Extend a running job's lease; returns False if the worker no longer holds it"""
+        with closing(self._connect()) as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET visible_at = ? WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (time.time() + self.visibility_timeout, job_id, worker_id)
+            ).rowcount
+        return bool(updated)
+    
+    def record_payment(self, job_id, payment):
+        """Store the payment made for a job so a retry delivers it instead of paying again.
+        
+        Recorded whoever holds the lease: the money has moved either way.
+        """
+        with closing(self._connect()) as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET payment = ? WHERE id = ? AND payment IS NULL",
+                (json.dumps(payment), job_id)
+            ).rowcount
+        return bool(updated)
+    
+    def complete(self, job_id, worker_id, result):
+        """Store the result of a job, as long as the worker still holds its lease"""
+        with closing(self._connect()) as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (json.dumps(result), time.time(), job_id, worker_id)
+            ).rowcount
+        return bool(updated)
+    
+    def fail(self, job_id, worker_id, error):
+        """Make a failed job visible again, or mark it dead once out of attempts"""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET "
+                "status = CASE WHEN attempts >= ? THEN 'dead' ELSE 'queued' END, "
+                "finished_at = CASE WHEN attempts >= ? THEN ? ELSE NULL END, "
+                "visible_at = ?, error = ?, lease_owner = NULL "
+                "WHERE id = ? AND lease_owner = ? AND status = 'running'",
+                (self.max_attempts, self.max_attempts, now, now, error, job_id, worker_id)
+            ).rowcount
+        return bool(updated)
+    
+    def counts(self):
+        """Count jobs by status"""
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+    
+    def pending(self):
+        """Number of jobs that are queued or still leased"""
+        counts = self.counts()
+        return counts.get('queued', 0) + counts.get('running', 0)
+    
+    def iter_results(self):
+        """Yield finished jobs with their results"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "SELECT id, payload, status, result, error FROM jobs "
+                "WHERE status IN ('done', 'dead') ORDER BY finished_at, created_at"
+            )
+            for job_id, payload, status, result, error in cursor:
+                yield {
+                    "id": job_id,
+                    "payload": json.loads(payload),
+                    "status": status,
+                    "result": json.loads(result) if result else None,
+                    "error": error
+                }
+        finally:
+            conn.close()
\ No newline at end of file
@@ -3,9 +3,11 @@ from langchain_anthropic import ChatAnthropic
 from langchain_openai import ChatOpenAI
 from config.settings import LLMSettings
 from config.yaml_config import ConfigLoader
+from core.tracing import Tracer
 
 class LLMProvider:
     @staticmethod
+    @Tracer.traced("LLMProvider.create_llm")
     def create_llm(provider=None, model_name=None, config_path='config.yaml'):
         """Create LLM instance with optional provider and model override"""
         try:
@@ -17,6 +19,7 @@ class LLMProvider:
                 model_name = ConfigLoader.get_llm_model(provider, config_path) or LLMSettings.MODEL_NAME
             
             print(f"Initializing {provider} LLM with model: {model_name}")
+            Tracer.annotate(provider=provider, model=model_name)
             
             if provider == "groq":
                 return ChatGroq(
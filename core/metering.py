@@ -0,0 +1,77 @@
+import threading
+from config.pricing import PricingConfig
+
+def estimate_tokens(text):
+    """Rough token count for streamed text (about four characters per token)"""
+    return max(1, round(len(text) / 4)) if text else 0
+
+
+class MeteredStream:
+    """Delivers a streamed generation in chunks, accruing charges against a pre-authorized budget"""
+    
+    def __init__(self, llm, budget, chunk_tokens=32, on_chunk=None, cancel_event=None, deadline=None):
+        self.llm = llm
+        self.budget = budget
+        self.chunk_tokens = chunk_tokens
+        self.on_chunk = on_chunk
+        self.cancel_event = cancel_event or threading.Event()
+        self.deadline = deadline
+        self.max_tokens = PricingConfig.max_tokens_for_budget(budget)
+        self.delivered = []
+        self.tokens = 0
+        self._pending = []
+        self._pending_tokens = 0
+    
+    def cancel(self):
+        """Stop after the current chunk; only delivered chunks are charged"""
+        self.cancel_event.set()
+    
+    def run(self, query):
+        """Stream the response until it completes, the budget runs out or the consumer cancels"""
+        stream = self.llm.stream(query)
+        stop_reason = None
+        try:
+            for message in stream:
+                if message.content:
+                    self._pending.append(message.content)
+                    self._pending_tokens += estimate_tokens(message.content)
+                if self._pending_tokens >= self.chunk_tokens:
+                    stop_reason = self._deliver_chunk()
+                    if stop_reason:
+                        break
+            else:
+                stop_reason = self._deliver_chunk() or "completed"
+        finally:
+            # Closing the generator stops generation and releases the connection
+            close = getattr(stream, "close", None)
+            if close:
+                close()
+        
+        return {
+            "content": "".join(self.delivered),
+            "tokens": self.tokens,
+            "accrued_cost": self.tokens * PricingConfig.COST_PER_TOKEN,
+            "stop_reason": stop_reason
+        }
+    
+    def _deliver_chunk(self):
+        """Deliver buffered text if the budget covers it; return a stop reason or None"""
+        if not self._pending:
+            return None
+        if self.tokens + self._pending_tokens > self.max_tokens:
+            return "budget_exhausted"
+        
+        chunk = "".join(self._pending)
+        self.delivered.append(chunk)
+        self.tokens += self._pending_tokens
+        self._pending = []
+        self._pending_tokens = 0
+        
+        accrued = self.tokens * PricingConfig.COST_PER_TOKEN
+        if self.on_chunk and self.on_chunk(chunk, self.tokens, accrued) is False:
+            return "cancelled"
+        if self.cancel_event.is_set():
+            return "cancelled"
+        if self.deadline and self.deadline.expired():
+            return "deadline"
+        return None
\ No newline at end of file
@@ -0,0 +1,32 @@
+import tracemalloc
+
+class MemoryTracker:
+    """Measures the peak Python heap growth of each query with tracemalloc.
+    
+    Peaks are process-wide, so they are per query when a process runs one
+    query at a time, as the CLI and queue workers do.
+    """
+    
+    enabled = False
+    
+    @classmethod
+    def enable(cls):
+        """Start tracing allocations; this slows allocation, so it is opt-in"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        cls.enabled = True
+    
+    @classmethod
+    def begin(cls):
+        """Reset the peak and return the current heap size as the query's baseline, or None"""
+        if not cls.enabled:
+            return None
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0]
+    
+    @classmethod
+    def peak_kb(cls, baseline):
+        """Peak heap growth in KB since begin() returned baseline, or None if not tracking"""
+        if not cls.enabled or baseline is None:
+            return None
+        return round((tracemalloc.get_traced_memory()[1] - baseline) / 1024, 1)
\ No newline at end of file
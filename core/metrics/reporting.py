@@ -1,21 +1,42 @@
+import uuid
+from typing import Optional
 from datetime import datetime
 import pandas as pd
 from core.metrics.tracker import PerformanceMetrics
+from core.metrics.memory import MemoryTracker
 
 class MonitoringDashboard:
     transactions = {}
+    history_limit = None  # Keep only the most recent transactions when set
     
     @classmethod
-    def log_transaction(cls, tx_hash: str, metrics: PerformanceMetrics):
-        """Log a transaction with its metrics"""
+    def log_transaction(cls, tx_hash: Optional[str], metrics: PerformanceMetrics):
+        """Log a transaction with its metrics.
+        
+        Outcomes without a payment (timeouts, cancellations, failures) pass no
+        tx_hash and get a unique key, so each one is counted; the report
+        groups them by metrics.status.
+        """
+        if tx_hash is None:
+            tx_hash = f"{metrics.status}_{uuid.uuid4().hex}"
         cls.transactions[tx_hash] = {
             "timestamp": datetime.now().isoformat(),
             "tokens": metrics.tokens_used,
             "cost": metrics.cost_usdc,
             "status": metrics.status,
             "duration": metrics.calculate_duration(),
-            "error": metrics.error
+            "error": metrics.error,
+            "wallet": metrics.wallet_id,
+            "tier": metrics.tier,
+            "model": metrics.model,
+            "stop_reason": metrics.stop_reason,
+            "cache_hit": metrics.cache_hit,
+            "peak_memory_kb": MemoryTracker.peak_kb(metrics.memory_baseline)
         }
+        
+        if cls.history_limit is not None:
+            while len(cls.transactions) > cls.history_limit:
+                del cls.transactions[next(iter(cls.transactions))]
     
     @classmethod
     def generate_report(cls):
@@ -25,10 +46,39 @@ class MonitoringDashboard:
             return {"status": "No transactions yet"}
         
         success_count = len(df[df.status == "delivered"])
-        return {
+        report = {
             "total_transactions": len(df),
             "success_rate": f"{success_count/len(df)*100:.1f}%" if len(df) > 0 else "0%",
             "avg_cost": f"${df.cost.mean():.6f}" if len(df) > 0 else "$0.000000",
             "avg_tokens": int(df.tokens.mean()) if len(df) > 0 else 0,
-            "avg_duration": f"{df.duration.mean():.2f}s" if len(df) > 0 else "0.00s"
-        }
\ No newline at end of file
+            "avg_duration": f"{df.duration.mean():.2f}s" if len(df) > 0 else "0.00s",
+            "p95_duration": f"{df.duration.quantile(0.95):.2f}s",
+            "timeout_rate": f"{len(df[df.status == 'timeout'])/len(df)*100:.1f}%",
+            "cache_hit_rate": f"{df.cache_hit.sum()/len(df)*100:.1f}%"
+        }
+        
+        # Show how payments were spread across a consumer wallet pool
+        if "wallet" in df and df.wallet.notna().any():
+            report["transactions_by_wallet"] = df.wallet.value_counts().to_dict()
+        
+        # Traffic share, latency and cost per model tier when auto-routing
+        if "tier" in df and df.tier.notna().any():
+            routed = df[df.tier.notna()]
+            report["tiers"] = {
+                tier: {
+                    "share": f"{len(group)/len(routed)*100:.1f}%",
+                    "avg_duration": f"{group.duration.mean():.2f}s",
+                    "avg_cost": f"${group.cost.mean():.6f}"
+                }
+                for tier, group in routed.groupby("tier")
+            }
+        
+        # Peak memory per query bounds how many can be in flight per GB of RAM
+        if "peak_memory_kb" in df and df.peak_memory_kb.notna().any():
+            peaks = df.peak_memory_kb.dropna()
+            report["memory"] = {
+                "avg_peak_kb": round(float(peaks.mean()), 1),
+                "max_peak_kb": round(float(peaks.max()), 1),
+                "queries_per_gb": int(1024 * 1024 / max(peaks.max(), 1))
+            }
+        return report
\ No newline at end of file
@@ -1,13 +1,20 @@
 from dataclasses import dataclass
 import time
 
-@dataclass
+@dataclass(slots=True)
 class PerformanceMetrics:
     start_time: float
     tokens_used: int = 0
     cost_usdc: float = 0.0
     status: str = "pending"
     error: str = None
+    wallet_id: str = None
+    tier: str = None
+    model: str = None
+    stop_reason: str = None
+    cache_hit: bool = False
+    agent_name: str = None
+    memory_baseline: int = None  # Heap size in bytes when the query started, if tracking memory
     
     def calculate_duration(self):
         """Calculate duration in seconds"""
@@ -0,0 +1,81 @@
+import re
+from config.yaml_config import ConfigLoader
+from core.llm import LLMProvider
+
+class ModelRouter:
+    """Routes queries to cheaper or larger model tiers with a local complexity classifier"""
+    
+    DEFAULT_TIERS = [
+        {"name": "fast", "provider": "groq", "model": "llama3-8b-8192", "max_score": 0.25},
+        {"name": "large", "provider": "groq", "model": "llama3-70b-8192"}
+    ]
+    # Each signal of a hard query adds its weight to the score
+    DEFAULT_WEIGHTS = {"keyword": 0.3, "length": 0.25, "structure": 0.15, "tools": 0.3}
+    
+    def __init__(self, config_path='config.yaml'):
+        """Load tiers and classifier settings from the routing section of config"""
+        self.config_path = config_path
+        routing = ConfigLoader.get_routing_config(config_path)
+        self.tiers = routing.get('tiers') or self.DEFAULT_TIERS
+        self.long_query_words = routing.get('long_query_words', 120)
+        self.hard_keywords = [keyword.lower() for keyword in routing.get('hard_keywords', [])]
+        self.weights = {**self.DEFAULT_WEIGHTS, **(routing.get('weights') or {})}
+        self.low_confidence_phrases = [phrase.lower() for phrase in routing.get('low_confidence_phrases', [])]
+        # Off unless configured: short answers such as "Paris." are usually correct
+        self.min_answer_words = routing.get('min_answer_words', 0)
+        self._llms = {}
+    
+    def score(self, query, agent_type=None):
+        """Estimate query complexity between 0 (trivial) and 1 (hard) from cheap features.
+        
+        Signals add up rather than being averaged, so one strong signal such
+        as a hard keyword or tool use is enough to leave the fast tier.
+        """
+        text = query.lower()
+        words = len(text.split())
+        
+        keyword_hits = sum(1 for keyword in self.hard_keywords if keyword in text)
+        score = self.weights['keyword'] * keyword_hits
+        score += self.weights['length'] * min(words / self.long_query_words, 1.0)
+        
+        # Several questions or code suggest a multi-step task
+        if text.count('?') > 1 or re.search(r'^\s*(\d+[.)]|-)\s', text, re.MULTILINE):
+            score += self.weights['structure']
+        if '```' in text or re.search(r'\b(def|class|function|select)\b.*[({]', text):
+            score += self.weights['structure']
+        if agent_type == 'tool_augmented':
+            score += self.weights['tools']
+        
+        return round(min(score, 1.0), 3)
+    
+    def route(self, query, agent_type=None):
+        """Pick the index of the cheapest tier that should handle the query"""
+        score = self.score(query, agent_type)
+        for index, tier in enumerate(self.tiers[:-1]):
+            if score <= tier.get('max_score', 0.5):
+                return index, score
+        return len(self.tiers) - 1, score
+    
+    def should_escalate(self, tier_index, content):
+        """Whether an answer looks low-confidence and a larger tier is available"""
+        if tier_index >= len(self.tiers) - 1:
+            return False
+        text = (content or '').strip().lower()
+        if len(text.split()) < self.min_answer_words:
+            return True
+        return any(phrase in text for phrase in self.low_confidence_phrases)
+    
+    def tier_name(self, tier_index):
+        """Display name of a tier"""
+        return self.tiers[tier_index].get('name', f"tier{tier_index}")
+    
+    def get_llm(self, tier_index):
+        """Get the LLM for a tier, creating it on first use"""
+        if tier_index not in self._llms:
+            tier = self.tiers[tier_index]
+            self._llms[tier_index] = LLMProvider.create_llm(
+                provider=tier.get('provider'),
+                model_name=tier.get('model'),
+                config_path=self.config_path
+            )
+        return self._llms[tier_index]
\ No newline at end of file
@@ -0,0 +1,229 @@
+import os
+import json
+import hashlib
+import time
+import threading
+from collections import deque
+import numpy as np
+from config.yaml_config import ConfigLoader
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model; recognizes paraphrases that share few words"""
+    
+    def __init__(self, model_name):
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError:
+            raise RuntimeError("The semantic cache needs sentence-transformers: pip install sentence-transformers")
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+    
+    def embed(self, text):
+        """Embed text as an L2-normalized float32 vector"""
+        return self.model.encode(text, normalize_embeddings=True).astype(np.float32)
+
+
+class VectorIndex:
+    """Bounded, memory-mapped vector index with per-slot metadata and LRU eviction.
+    
+    Vectors are written to disk as soon as they are added, but entries.json
+    only on flush(). Each slot's query hash is written next to its vector, so
+    after an unclean exit a slot whose saved entry belongs to another query is
+    dropped instead of answering with that entry.
+    """
+    
+    def __init__(self, path, dim, capacity):
+        self.path = path
+        self.dim = dim
+        self.capacity = capacity
+        os.makedirs(path, exist_ok=True)
+        
+        vectors_path = os.path.join(path, "vectors.f32")
+        self.meta_path = os.path.join(path, "entries.json")
+        mode = 'w+'
+        if os.path.exists(vectors_path):
+            if os.path.getsize(vectors_path) != capacity * dim * 4:
+                raise ValueError(f"Existing index at {path} does not match capacity={capacity}, dim={dim}")
+            mode = 'r+'
+        self.vectors = np.memmap(vectors_path, dtype=np.float32, mode=mode, shape=(capacity, dim))
+        keys_path = os.path.join(path, "keys.u64")
+        self.keys = np.memmap(keys_path, dtype=np.uint64, mode='r+' if os.path.exists(keys_path) else 'w+', shape=(capacity,))
+        
+        self.entries = [None] * capacity
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'r') as f:
+                saved = json.load(f)
+            self.entries[:len(saved)] = saved[:capacity]
+        for slot, entry in enumerate(self.entries):
+            if entry is not None and self.keys[slot] != self.query_key(entry["query"]):
+                self.entries[slot] = None
+        
+        # Dense arrays mirror the metadata so search and eviction stay vectorized
+        self.used = np.array([entry is not None for entry in self.entries], dtype=bool)
+        self.last_used = np.array([entry["last_used"] if entry else 0.0 for entry in self.entries])
+        self.agents = np.array([entry["agent"] if entry else "" for entry in self.entries], dtype=object)
+    
+    def __len__(self):
+        return int(self.used.sum())
+    
+    @staticmethod
+    def query_key(query):
+        """Nonzero 64-bit hash of a query; 0 marks a slot being overwritten"""
+        return np.uint64(int.from_bytes(hashlib.blake2b(query.encode('utf-8'), digest_size=8).digest(), 'little') | 1)
+    
+    def search(self, vector, agent):
+        """Return (slot, similarity) of the closest entry for an agent, or (None, 0.0)"""
+        mask = self.used & (self.agents == agent)
+        if not mask.any():
+            return None, 0.0
+        slots = np.flatnonzero(mask)
+        scores = self.vectors[slots] @ vector
+        best = int(np.argmax(scores))
+        return int(slots[best]), float(scores[best])
+    
+    def add(self, vector, entry):
+        """Store a vector in a free slot, evicting the least recently used entry when full"""
+        free = np.flatnonzero(~self.used)
+        slot = int(free[0]) if len(free) else int(np.argmin(self.last_used))
+        # Invalidate the slot first, so a crash midway never pairs a vector with another query's key
+        self.keys[slot] = 0
+        self.vectors[slot] = vector
+        self.keys[slot] = self.query_key(entry["query"])
+        self.entries[slot] = entry
+        self.used[slot] = True
+        self.last_used[slot] = entry["last_used"]
+        self.agents[slot] = entry["agent"]
+        return slot
+    
+    def touch(self, slot):
+        """Mark an entry as recently used"""
+        now = time.time()
+        self.last_used[slot] = now
+        self.entries[slot]["last_used"] = now
+        self.entries[slot]["hits"] = self.entries[slot].get("hits", 0) + 1
+    
+    def flush(self):
+        """Persist vectors and metadata to disk"""
+        self.vectors.flush()
+        self.keys.flush()
+        tmp_path = f"{self.meta_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.meta_path)
+
+
+class SemanticCache:
+    """Serves near-duplicate queries from earlier responses using embedding similarity"""
+    
+    def __init__(self, config_path='config.yaml'):
+        """Set up the embedder and index from the semantic_cache section of config"""
+        settings = ConfigLoader.get_semantic_cache_config(config_path)
+        self.default_threshold = settings.get('default_threshold', 0.92)
+        self.thresholds = settings.get('thresholds', {}) or {}
+        self.flush_every = settings.get('flush_every', 20)
+        self.embedder = self._create_embedder(settings)
+        # Vectors from different models are not comparable, so each model has its own index
+        self.index = VectorIndex(
+            os.path.join(settings.get('path', 'cache/semantic'), settings['embedding_model'].replace('/', '_')),
+            self.embedder.dim,
+            settings.get('capacity', 10000)
+        )
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.hit_similarities = deque(maxlen=10000)
+    
+    @staticmethod
+    def _create_embedder(settings):
+        """Load the configured sentence-transformers model"""
+        model_name = settings.get('embedding_model')
+        if not model_name:
+            raise ValueError("semantic_cache.embedding_model must name a sentence-transformers model")
+        return SentenceTransformerEmbedder(model_name)
+    
+    def threshold_for(self, agent):
+        """Similarity needed for a cache hit for this agent"""
+        return self.thresholds.get(agent, self.default_threshold)
+    
+    def lookup(self, query, agent):
+        """Return a cached response for a near-duplicate query, or None"""
+        vector = self.embedder.embed(query)
+        with self._lock:
+            slot, similarity = self.index.search(vector, agent)
+            if slot is None or similarity < self.threshold_for(agent):
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self.hit_similarities.append(similarity)
+            self.index.touch(slot)
+            entry = dict(self.index.entries[slot])
+        entry["similarity"] = similarity
+        return entry
+    
+    def store(self, query, agent, content, tokens):
+        """Cache a response for future near-duplicates"""
+        vector = self.embedder.embed(query)
+        now = time.time()
+        entry = {
+            "agent": agent,
+            "query": query,
+            "content": content,
+            "tokens": tokens,
+            "created": now,
+            "last_used": now,
+            "hits": 0
+        }
+        with self._lock:
+            self.index.add(vector, entry)
+            self._pending_writes += 1
+            if self._pending_writes >= self.flush_every:
+                self.index.flush()
+                self._pending_writes = 0
+    
+    def flush(self):
+        """Write pending entries to disk"""
+        with self._lock:
+            self.index.flush()
+            self._pending_writes = 0
+    
+    def stats(self):
+        """Hit rate and hit similarity distribution, for tuning thresholds"""
+        lookups = self.hits + self.misses
+        stats = {
+            "entries": len(self.index),
+            "capacity": self.index.capacity,
+            "lookups": lookups,
+            "hits": self.hits,
+            "hit_rate": f"{self.hits/lookups*100:.1f}%" if lookups else "0.0%"
+        }
+        if self.hit_similarities:
+            stats["hit_similarity_min"] = round(min(self.hit_similarities), 3)
+            stats["hit_similarity_p10"] = round(float(np.percentile(self.hit_similarities, 10)), 3)
+        return stats
+    
+    def evaluate(self, pairs, thresholds=None):
+        """Measure hit rate and false-hit rate per threshold on labeled query pairs.
+        
+        Each pair is a dict with 'a', 'b' and a boolean 'duplicate'. A hit on a
+        non-duplicate pair is a false hit, i.e. a wrong cached answer served.
+        """
+        thresholds = thresholds or [0.80, 0.85, 0.88, 0.90, 0.92, 0.95]
+        similarities = np.array([
+            float(self.embedder.embed(pair['a']) @ self.embedder.embed(pair['b'])) for pair in pairs
+        ])
+        labels = np.array([bool(pair['duplicate']) for pair in pairs])
+        
+        results = []
+        for threshold in thresholds:
+            hit = similarities >= threshold
+            true_hits = int((hit & labels).sum())
+            false_hits = int((hit & ~labels).sum())
+            results.append({
+                "threshold": threshold,
+                "hit_rate": round(float(hit.mean()), 3) if len(hit) else 0.0,
+                "recall": round(true_hits / int(labels.sum()), 3) if labels.any() else 0.0,
+                "false_hit_rate": round(false_hits / hit.sum(), 3) if hit.any() else 0.0
+            })
+        return results
\ No newline at end of file
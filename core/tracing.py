@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import random
+import functools
+import threading
+import contextvars
+from collections import deque
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """A timed, nested unit of work recorded as a Chrome trace 'complete' event"""
+    __slots__ = ("name", "attrs", "sampled", "tid", "start", "_token")
+    
+    def __init__(self, name, attrs, sampled, tid):
+        self.name = name
+        self.attrs = attrs
+        self.sampled = sampled
+        self.tid = tid
+        self.start = None
+        self._token = None
+    
+    def set(self, **attrs):
+        """Attach attributes such as model, tokens or tx hash to the span"""
+        if self.sampled:
+            self.attrs.update(attrs)
+    
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        self.start = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        _current_span.reset(self._token)
+        if self.sampled:
+            if exc_type is not None:
+                self.attrs["error"] = repr(exc)
+            Tracer.record(self, end)
+        return False
+
+
+class _NullSpan:
+    """Span stand-in used while tracing is disabled"""
+    __slots__ = ()
+    
+    def set(self, **attrs):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Opt-in per-request span recorder with Chrome trace / Perfetto JSON export"""
+    enabled = False
+    sample_rate = 1.0
+    max_events = 100000  # Keep only the most recent spans on long runs
+    events = deque(maxlen=max_events)
+    dropped = 0
+    _lock = threading.Lock()
+    
+    @classmethod
+    def enable(cls, sample_rate=1.0, max_events=None):
+        """Start recording spans for the given fraction of traces"""
+        cls.enabled = True
+        cls.sample_rate = sample_rate
+        if max_events is not None:
+            cls.max_events = max_events
+            cls.events = deque(cls.events, maxlen=max_events)
+    
+    @classmethod
+    def span(cls, name, **attrs):
+        """Open a span nested under the current one.
+        
+        Whether a trace is sampled is decided once at its root span and
+        inherited by every span opened beneath it, including in threads that
+        copy the context (such as LangGraph's node executor). So is the root
+        span's thread id: trace viewers nest spans by thread, and spans run on
+        executor threads would otherwise not appear under their query.
+        """
+        if not cls.enabled:
+            return _NULL_SPAN
+        parent = _current_span.get()
+        if parent is not None:
+            return Span(name, attrs, parent.sampled, parent.tid)
+        return Span(name, attrs, random.random() < cls.sample_rate, threading.get_ident())
+    
+    @classmethod
+    def annotate(cls, **attrs):
+        """Attach attributes to the innermost open span"""
+        if cls.enabled:
+            span = _current_span.get()
+            if span is not None:
+                span.set(**attrs)
+    
+    @classmethod
+    def traced(cls, name):
+        """Decorator that wraps every call of a function in a span"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not cls.enabled:
+                    return func(*args, **kwargs)
+                with cls.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+    
+    @classmethod
+    def record(cls, span, end):
+        """Store a finished span as a trace event"""
+        event = {
+            "name": span.name,
+            "cat": "payed-agents",
+            "ph": "X",
+            "ts": span.start / 1000,
+            "dur": (end - span.start) / 1000,
+            "pid": os.getpid(),
+            "tid": span.tid,
+            "args": span.attrs
+        }
+        with cls._lock:
+            if len(cls.events) == cls.events.maxlen:
+                cls.dropped += 1
+            cls.events.append(event)
+    
+    @classmethod
+    def export(cls, filename="trace.json"):
+        """Write recorded spans as Chrome trace-event JSON (chrome://tracing, ui.perfetto.dev)"""
+        with cls._lock:
+            data = {"traceEvents": list(cls.events), "displayTimeUnit": "ms"}
+            dropped = cls.dropped
+        with open(filename, 'w') as f:
+            json.dump(data, f, default=str)
+        print(f"\nTrace with {len(data['traceEvents'])} spans exported to {filename}")
+        if dropped:
+            print(f"{dropped} older spans were dropped; raise --trace-max-spans to keep more")
\ No newline at end of file
@@ -1,8 +1,13 @@
+import time
+import random
+import threading
 from cdp import Wallet, Cdp
 from config.settings import WalletSettings
+from core.tracing import Tracer
 
 class WalletManager:
     @staticmethod
+    @Tracer.traced("WalletManager.initialize_cdp")
     def initialize_cdp(api_key_path):
         """Initialize CDP with API key"""
         try:
@@ -13,13 +18,16 @@ class WalletManager:
             return False
     
     @staticmethod
+    @Tracer.traced("WalletManager.import_wallet")
     def import_wallet(wallet_id, seed_file):
         """Import an existing wallet"""
+        Tracer.annotate(wallet_id=wallet_id)
         try:
             wallet = Wallet.fetch(wallet_id)
             wallet.load_seed_from_file(seed_file)
             print(f"  Imported wallet: {wallet_id}")
             wallet.addresses  # Fetch addresses
+            WalletRegistry.register(wallet)
             return wallet
         except Exception as e:
             print(f"  Failed to import wallet: {str(e)}")
@@ -33,4 +41,135 @@ class WalletManager:
     @classmethod
     def import_provider_wallet(cls, seed_file):
         """Import provider wallet using predefined ID"""
-        return cls.import_wallet(WalletSettings.PROVIDER_WALLET_ID, seed_file)
\ No newline at end of file
+        return cls.import_wallet(WalletSettings.PROVIDER_WALLET_ID, seed_file)
+    
+    @classmethod
+    def import_consumer_pool(cls, wallet_entries):
+        """Import every consumer wallet listed in config into a pool"""
+        wallets = []
+        for entry in wallet_entries:
+            wallet = cls.import_wallet(entry['id'], entry['seed'])
+            if wallet:
+                wallets.append(wallet)
+        
+        if not wallets:
+            print("  No consumer wallets could be imported")
+            return None
+        return ConsumerWalletPool(wallets)
+
+
+class WalletRegistry:
+    """Imported wallets by id, so workflow state carries ids instead of SDK objects"""
+    
+    _wallets = {}
+    _lock = threading.Lock()
+    
+    @classmethod
+    def register(cls, wallet):
+        """Make a wallet resolvable by its id and return the id"""
+        with cls._lock:
+            cls._wallets[wallet.id] = wallet
+        return wallet.id
+    
+    @classmethod
+    def get(cls, wallet_id):
+        """Resolve a wallet id registered by an import"""
+        wallet = cls._wallets.get(wallet_id)
+        if wallet is None:
+            raise LookupError(f"Wallet {wallet_id} has not been imported")
+        return wallet
+
+
+class ConsumerWalletPool:
+    """Spreads consumer payments across wallets by free balance and in-flight load.
+    
+    Each payment picks a wallet at random among those that can cover it,
+    weighted by free balance, so payments rotate across wallets even when
+    one query is paid at a time and when each worker has its own pool.
+    """
+    
+    def __init__(self, wallets, asset_id=None, refresh_interval=None):
+        self.wallets = {wallet.id: wallet for wallet in wallets}
+        self.asset_id = asset_id or WalletSettings.ASSET_ID
+        self.refresh_interval = WalletSettings.BALANCE_REFRESH_SECONDS if refresh_interval is None else refresh_interval
+        self._lock = threading.Lock()
+        self._balances = {}
+        self._refreshed_at = {}
+        self._reserved = {wallet_id: 0.0 for wallet_id in self.wallets}
+        self._in_flight = {wallet_id: 0 for wallet_id in self.wallets}
+        
+        for wallet_id in self.wallets:
+            self.refresh_balance(wallet_id)
+    
+    def __len__(self):
+        return len(self.wallets)
+    
+    @Tracer.traced("ConsumerWalletPool.refresh_balance")
+    def refresh_balance(self, wallet_id):
+        """Fetch the on-chain balance of one wallet"""
+        try:
+            balance = float(self.wallets[wallet_id].balance(self.asset_id))
+        except Exception as e:
+            print(f"  Failed to fetch balance for wallet {wallet_id}: {str(e)}")
+            balance = 0.0
+        with self._lock:
+            self._balances[wallet_id] = balance
+            self._refreshed_at[wallet_id] = time.monotonic()
+        return balance
+    
+    def refresh_stale(self, force=False):
+        """Re-fetch balances older than refresh_interval, e.g. after top-ups or drift"""
+        now = time.monotonic()
+        for wallet_id in self.wallets:
+            if force or now - self._refreshed_at.get(wallet_id, 0.0) >= self.refresh_interval:
+                self.refresh_balance(wallet_id)
+    
+    def acquire(self, amount):
+        """Reserve amount on a wallet that can cover it, chosen at random weighted by free balance"""
+        self.refresh_stale()
+        wallet_id = self._choose(amount)
+        if wallet_id is None:
+            # Cached balances may predate a top-up
+            self.refresh_stale(force=True)
+            wallet_id = self._choose(amount)
+        if wallet_id is None:
+            raise RuntimeError(f"No consumer wallet has {amount} {self.asset_id} available")
+        return self.wallets[wallet_id]
+    
+    def _choose(self, amount):
+        """Pick and reserve an eligible wallet id, or return None if no wallet can cover amount"""
+        with self._lock:
+            wallet_ids = []
+            weights = []
+            for wallet_id in self.wallets:
+                available = self._balances.get(wallet_id, 0.0) - self._reserved[wallet_id]
+                if available >= amount:
+                    wallet_ids.append(wallet_id)
+                    weights.append(max(available, 1e-9) / (1 + self._in_flight[wallet_id]))
+            
+            if not wallet_ids:
+                return None
+            
+            wallet_id = random.choices(wallet_ids, weights=weights)[0]
+            self._reserved[wallet_id] += amount
+            self._in_flight[wallet_id] += 1
+            return wallet_id
+    
+    def release(self, wallet, amount, charged=0.0):
+        """Release a reservation, debiting the cached balance by what was actually charged"""
+        with self._lock:
+            self._reserved[wallet.id] = max(self._reserved[wallet.id] - amount, 0.0)
+            self._in_flight[wallet.id] = max(self._in_flight[wallet.id] - 1, 0)
+            self._balances[wallet.id] = self._balances.get(wallet.id, 0.0) - charged
+    
+    def stats(self):
+        """Snapshot of balance, reservations and in-flight transfers per wallet"""
+        with self._lock:
+            return {
+                wallet_id: {
+                    "balance": self._balances.get(wallet_id, 0.0),
+                    "reserved": self._reserved[wallet_id],
+                    "in_flight": self._in_flight[wallet_id]
+                }
+                for wallet_id in self.wallets
+            }
\ No newline at end of file
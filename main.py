@@ -2,11 +2,20 @@ import time
 import argparse
 import sys
 import os
+import json
 from cli.app import CDPCliApp
+from cli.output import OutputFormatter
 from config.paths import Paths
 from config.yaml_config import ConfigLoader
 from core.llm import LLMProvider
 from core.agent_manager import AgentManager
+from core.job_queue import JobQueue
+from cli.worker import WorkerPool
+from cli.ingest import JsonlIngest, iter_jsonl_requests
+from cli.bulk import BulkRunner
+from core.metrics.reporting import MonitoringDashboard
+from core.tracing import Tracer
+from core.semantic_cache import SemanticCache
 
 def main():
     # Load config
@@ -22,14 +31,28 @@ def main():
     
     parser = argparse.ArgumentParser(description="CDP CLI Application")
     parser.add_argument("--query", help="Query to process")
-    parser.add_argument("--file", help="Path to file containing query")
+    parser.add_argument("--file", help="Path to file containing query, or a .jsonl file with one request per line")
+    parser.add_argument("--output", help="Where to stream results for a .jsonl --file (default: <file>.results.jsonl)")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint of a previous .jsonl run and start over")
+    parser.add_argument("--bulk", action="store_true", help="Run a .jsonl --file through provider batch APIs at batch prices, then pay for and deliver each result")
     parser.add_argument("--export-report", action="store_true", help="Export report to JSON")
     parser.add_argument("--config", help="Path to YAML config file", default="config.yaml")
+    parser.add_argument("--trace", help="Record per-request spans and export them as Chrome trace JSON to this file")
+    parser.add_argument("--trace-sample-rate", type=float, default=1.0, help="Fraction of requests to trace (default: 1.0)")
+    parser.add_argument("--trace-max-spans", type=int, default=Tracer.max_events,
+                        help=f"Keep at most this many of the most recent spans in memory (default: {Tracer.max_events})")
+    parser.add_argument("--timeout", type=float, help="Deadline in seconds for each query, covering inference and payment")
+    parser.add_argument("--executor", choices=["langgraph", "direct"], default="langgraph",
+                        help="Workflow runtime: the LangGraph graph or direct in-process node calls (default: langgraph)")
+    parser.add_argument("--track-memory", action="store_true", help="Measure peak memory per query with tracemalloc and include it in the report")
     
     # LLM options
     llm_group = parser.add_argument_group('LLM Options')
     llm_group.add_argument("--provider", choices=available_providers, help="LLM provider to use")
     llm_group.add_argument("--model", help="Specific model to use with the selected provider")
+    llm_group.add_argument("--stream-budget", type=float, help="Stream the response and stop once this many USDC have been charged")
+    llm_group.add_argument("--chunk-tokens", type=int, default=32, help="Approximate tokens per metered stream chunk (default: 32)")
+    llm_group.add_argument("--auto-route", action="store_true", help="Route each query to a fast or large model tier by complexity")
     llm_group.add_argument("--list-models", action="store_true", help="List available models for the specified provider")
     
     # Agent options
@@ -37,6 +60,19 @@ def main():
     agent_group.add_argument("--agent", choices=available_agents, help="Agent to use for processing query")
     agent_group.add_argument("--list-agents", action="store_true", help="List available agents and their descriptions")
     
+    # Semantic cache options
+    cache_group = parser.add_argument_group('Semantic Cache Options')
+    cache_group.add_argument("--semantic-cache", action="store_true", help="Serve near-duplicate queries from earlier responses at a reduced price")
+    cache_group.add_argument("--cache-eval", help="Evaluate cache thresholds on a JSONL file of labeled query pairs (a, b, duplicate)")
+    
+    # Queue options
+    queue_group = parser.add_argument_group('Queue Options')
+    queue_group.add_argument("--queue", help="Path to the SQLite job queue", default="jobs.db")
+    queue_group.add_argument("--enqueue", action="store_true", help="Add the query to the job queue instead of processing it")
+    queue_group.add_argument("--workers", type=int, help="Process queued jobs with this many worker processes")
+    queue_group.add_argument("--keep-alive", action="store_true", help="Keep workers polling after the queue drains")
+    queue_group.add_argument("--export-results", help="Export finished queue jobs to a JSONL file")
+    
     args = parser.parse_args()
     
     # If list-models flag is set, just show available models and exit
@@ -57,6 +93,94 @@ def main():
         print(f"\nDefault agent: {default_agent}")
         sys.exit(0)
     
+    # Tune cache thresholds offline: hit rate vs. wrong answers served
+    if args.cache_eval:
+        with open(args.cache_eval, 'r') as f:
+            pairs = [json.loads(line) for line in f if line.strip()]
+        OutputFormatter.print_cache_evaluation(SemanticCache(config_path=args.config).evaluate(pairs))
+        sys.exit(0)
+    
+    if args.trace:
+        Tracer.enable(sample_rate=args.trace_sample_rate, max_events=args.trace_max_spans)
+    
+    # Get paths from config
+    paths = ConfigLoader.get_paths()
+    app_kwargs = dict(
+        cdp_api_path=paths.get('cdp_api', "api-key/cdp_api_key.json"),
+        consumer_seed_path=paths.get('consumer_seed', "wallets/consumer_seed.json"),
+        provider_seed_path=paths.get('provider_seed', "wallets/provider_seed.json"),
+        llm_provider=args.provider,
+        llm_model=args.model,
+        agent_name=args.agent,
+        config_path=args.config,
+        timeout=args.timeout,
+        auto_route=args.auto_route and not (args.provider or args.model),
+        stream_budget=args.stream_budget,
+        chunk_tokens=args.chunk_tokens,
+        semantic_cache=args.semantic_cache,
+        executor=args.executor,
+        track_memory=args.track_memory
+    )
+    
+    # Worker mode: drain the job queue with a pool of processes
+    if args.workers:
+        if args.semantic_cache:
+            # The cache's memory-mapped index and entry file are not safe to share between processes
+            print("Error: --semantic-cache cannot be used with --workers")
+            sys.exit(1)
+        print(f"Starting {args.workers} workers on queue {args.queue}...")
+        trace = (args.trace, args.trace_sample_rate, args.trace_max_spans) if args.trace else None
+        WorkerPool(args.workers, app_kwargs, args.queue, keep_alive=args.keep_alive, trace=trace).run()
+        print(f"Queue status: {JobQueue(args.queue).counts()}")
+        if args.export_results:
+            OutputFormatter.export_results(JobQueue(args.queue).iter_results(), args.export_results)
+        sys.exit(0)
+    
+    if args.export_results and not (args.query or args.file):
+        OutputFormatter.export_results(JobQueue(args.queue).iter_results(), args.export_results)
+        sys.exit(0)
+    
+    if args.bulk and not (args.file and args.file.endswith('.jsonl')):
+        print("Error: --bulk requires a .jsonl --file")
+        sys.exit(1)
+    
+    # JSONL workloads are streamed line by line instead of read as one query
+    if args.file and args.file.endswith('.jsonl'):
+        if not os.path.exists(args.file):
+            print(f"Error: Request file does not exist: {args.file}")
+            sys.exit(1)
+        
+        if args.enqueue:
+            queue = JobQueue(args.queue)
+            created = 0
+            for offset, request in iter_jsonl_requests(args.file):
+                if "error" in request:
+                    print(f"Skipping {request['id']}: {request['error']}")
+                    continue
+                payload = {key: value for key, value in request.items() if key != "id" and value}
+                # Byte offsets repeat across files; without an explicit id, key the job by its payload
+                key = None if request["id"] == f"offset:{offset}" else request["id"]
+                created += queue.enqueue(payload, idempotency_key=key)[1]
+            print(f"Enqueued {created} new jobs in {args.queue}")
+            sys.exit(0)
+        
+        app = CDPCliApp(**app_kwargs)
+        if not app.initialize():
+            print("Initialization failed. Exiting.")
+            sys.exit(1)
+        
+        # Keep memory flat over long runs; full results are in the output file
+        MonitoringDashboard.history_limit = 1000
+        output_path = args.output or f"{os.path.splitext(args.file)[0]}.results.jsonl"
+        runner = BulkRunner(app, args.file, output_path) if args.bulk else JsonlIngest(app, args.file, output_path)
+        if args.restart:
+            runner.reset()
+        runner.run()
+        app.show_report(export=args.export_report)
+        if args.trace:
+            Tracer.export(args.trace)
+        sys.exit(0)
+    
     # Get query from file or command line
     query = None
     if args.query:
@@ -71,19 +195,15 @@ def main():
         print("Error: Either --query or --file must be provided")
         sys.exit(1)
     
-    # Get paths from config
-    paths = ConfigLoader.get_paths()
+    # Add the query to the job queue for workers to pick up
+    if args.enqueue:
+        job_id, created = JobQueue(args.queue).enqueue({"query": query})
+        status = "Enqueued" if created else "Already queued"
+        print(f"{status} job {job_id} in {args.queue}")
+        sys.exit(0)
     
     # Initialize CLI application with config
-    app = CDPCliApp(
-        cdp_api_path=paths.get('cdp_api', "api-key/cdp_api_key.json"),
-        consumer_seed_path=paths.get('consumer_seed', "wallets/consumer_seed.json"),
-        provider_seed_path=paths.get('provider_seed', "wallets/provider_seed.json"),
-        llm_provider=args.provider,
-        llm_model=args.model,
-        agent_name=args.agent,
-        config_path=args.config
-    )
+    app = CDPCliApp(**app_kwargs)
     if not app.initialize():
         print("Initialization failed. Exiting.")
         sys.exit(1)
@@ -91,6 +211,8 @@ def main():
     # Process query and show report
     app.process_query(query)
     app.show_report(export=args.export_report)
+    if args.trace:
+        Tracer.export(args.trace)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
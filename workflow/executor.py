@@ -0,0 +1,40 @@
+from workflow.state import AgentState
+
+class DirectExecutor:
+    """Runs the workflow nodes as plain method calls on one mutable state dict.
+    
+    Same nodes, routing and output as the compiled LangGraph graph, without
+    its per-step channel writes, state coercion and runnable dispatch.
+    """
+    
+    STATE_KEYS = frozenset(AgentState.__annotations__)
+    
+    def __init__(self, nodes, route_payment):
+        self.nodes = nodes
+        self.route_payment = route_payment
+    
+    @classmethod
+    def _apply(cls, state, update):
+        """Merge a node's partial update into the state in place"""
+        if not update:
+            return
+        unknown = update.keys() - cls.STATE_KEYS
+        if unknown:
+            raise ValueError(f"Invalid state update, unknown keys: {sorted(unknown)}")
+        state.update(update)
+    
+    def invoke(self, state):
+        """Run consumer, payment check, then provider and delivery or failure handling"""
+        # Undeclared keys are rejected and missing ones read as None, as with LangGraph
+        self._apply(state, state)
+        for key in self.STATE_KEYS:
+            state.setdefault(key, None)
+        
+        self._apply(state, self.nodes.consumer_agent(state))
+        self._apply(state, self.nodes.verify_payment(state))
+        if self.route_payment(state) == "provider":
+            self._apply(state, self.nodes.provider_agent(state))
+            self._apply(state, self.nodes.deliver_data(state))
+        else:
+            self._apply(state, self.nodes.payment_failure(state))
+        return state
\ No newline at end of file
@@ -1,14 +1,29 @@
 from langgraph.graph import StateGraph, END
 from workflow.state import AgentState
 from workflow.nodes import WorkflowNodes
+from workflow.executor import DirectExecutor
 
 class WorkflowGraph:
-    def __init__(self, llm):
-        self.nodes = WorkflowNodes(llm)
+    EXECUTORS = ("langgraph", "direct")
+    
+    def __init__(self, llm, router=None, executor="langgraph"):
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Unknown executor '{executor}', expected one of {self.EXECUTORS}")
+        self.nodes = WorkflowNodes(llm, router=router)
+        self.executor = executor
         self.chain = None
     
+    @staticmethod
+    def route_payment(state):
+        """Continue to the provider only once payment is verified"""
+        return "provider" if state.get("payment_verified") else "handle_failure"
+    
     def build(self):
         """Build workflow graph"""
+        if self.executor == "direct":
+            self.chain = DirectExecutor(self.nodes, self.route_payment)
+            return self.chain
+        
         workflow = StateGraph(AgentState)
         
         # Add nodes
@@ -23,7 +38,7 @@ class WorkflowGraph:
         workflow.add_edge("consumer", "verify_payment")
         workflow.add_conditional_edges(
             "verify_payment",
-            lambda s: "provider" if s.get("payment_verified") else "handle_failure",
+            self.route_payment,
             {"provider": "provider", "handle_failure": "handle_failure"}
         )
         workflow.add_edge("provider", "deliver_data")
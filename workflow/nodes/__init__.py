@@ -3,25 +3,31 @@ from workflow.nodes.consumer import ConsumerNode
 from workflow.nodes.provider import ProviderNode
 from workflow.nodes.payment import PaymentNode
 from workflow.nodes.delivery import DeliveryNode
+from core.tracing import Tracer
 
 class WorkflowNodes:
-    def __init__(self, llm):
-        self.consumer = ConsumerNode(llm)
+    def __init__(self, llm, router=None):
+        self.consumer = ConsumerNode(llm, router=router)
         self.provider = ProviderNode()
         self.payment = PaymentNode()
         self.delivery = DeliveryNode()
     
+    @Tracer.traced("node.consumer")
     def consumer_agent(self, state):
         return self.consumer.process(state)
     
+    @Tracer.traced("node.verify_payment")
     def verify_payment(self, state):
         return self.payment.verify(state)
     
+    @Tracer.traced("node.provider")
     def provider_agent(self, state):
         return self.provider.process(state)
     
+    @Tracer.traced("node.deliver_data")
     def deliver_data(self, state):
         return self.delivery.deliver(state)
     
+    @Tracer.traced("node.handle_failure")
     def payment_failure(self, state):
         return self.payment.handle_failure(state)
\ No newline at end of file
@@ -4,48 +4,240 @@ from core.metrics.tracker import PerformanceMetrics
 from core.metrics.reporting import MonitoringDashboard
 from config.pricing import PricingConfig
 from config.settings import WalletSettings
+from core.deadline import DeadlineExceeded, PaymentPending, invoke_with_deadline
+from core.tracing import Tracer
+from core.metering import MeteredStream
+from core.wallet import WalletRegistry
 
 class ConsumerNode:
-    def __init__(self, llm):
+    def __init__(self, llm, router=None):
         self.llm = llm
-
+        self.router = router
+    
     def process(self, state: AgentState) -> AgentState:
         """Consumer agent node"""
         if not state.get("data_request"):
             return {"error": "No data request provided"}
         
-        metrics = PerformanceMetrics(start_time=state.get("metrics").start_time 
-                                    if state.get("metrics") else time.time())
+        incoming = state.get("metrics")
+        metrics = PerformanceMetrics(
+            start_time=incoming.start_time if incoming else time.time(),
+            memory_baseline=incoming.memory_baseline if incoming else None
+        )
+        
+        deadline = state.get("deadline")
+        budget = state.get("stream_budget")
+        prepared = state.get("prepared_response")
+        wallet = None
+        reserved = False
+        charged = 0.0
         
         try:
-            print("Processing request with LLM...")
-            response = self.llm.invoke(state["data_request"])
-            tokens = response.response_metadata['token_usage']['completion_tokens']
-            cost = PricingConfig.calculate_cost(tokens)
+            if prepared and prepared.get("tx_hash"):
+                # Paid on an earlier attempt of this job: deliver without paying again
+                print(f"Reusing payment {prepared['tx_hash']} from an earlier attempt...")
+                metrics.wallet_id = prepared.get("wallet_id")
+                metrics.agent_name = prepared.get("agent")
+                metrics.tokens_used = prepared["tokens"]
+                metrics.cost_usdc = prepared["cost"]
+                metrics.status = "paid"
+                return {
+                    "tx_hash": prepared["tx_hash"],
+                    "token_usage": prepared["tokens"],
+                    "calculated_cost": prepared["cost"],
+                    "metrics": metrics,
+                    "initial_response": prepared["content"],
+                    "payment_verified": None
+                }
+            elif prepared and prepared.get("source") == "batch":
+                # Generated by an offline provider batch job: no inference, batch price
+                print("Using batch response...")
+                content, tokens = prepared["content"], prepared["tokens"]
+                cost = PricingConfig.calculate_batch_cost(tokens)
+                metrics.model = prepared.get("model")
+            elif prepared:
+                # Served from the semantic cache: no inference, reduced price
+                print("Using cached response...")
+                content, tokens = prepared["content"], prepared["tokens"]
+                cost = PricingConfig.calculate_cache_hit_cost(tokens)
+                metrics.cache_hit = True
+            elif budget:
+                # Metered mode: reserve the budget, stream, then settle once for what was delivered
+                wallet = self._authorize(state, budget)
+                reserved = True
+                print(f"Streaming response against a budget of {budget} USDC...")
+                content, tokens = self._generate_metered(state, metrics, budget)
+                if not tokens:
+                    metrics.status = "cancelled"
+                    metrics.error = "Stream stopped before any output was delivered"
+                    return {"error": metrics.error, "metrics": metrics}
+                cost = min(PricingConfig.calculate_cost(tokens), budget)
+            else:
+                print("Processing request with LLM...")
+                response, tokens = self._generate(state, metrics, deadline)
+                content = response.content
+                cost = PricingConfig.calculate_cost(tokens)
             
+            # Delivered stream chunks are settled even past the deadline
             print(f"Sending payment of {cost} USDC...")
-            transfer = state["consumer_wallet"].transfer(
-                amount=cost,
-                asset_id=WalletSettings.ASSET_ID,
-                destination=state["provider_wallet"],
-                gasless=WalletSettings.GASLESS
-            ).wait()
+            on_broadcast = None
+            if state.get("payment_callback"):
+                # Record what will be delivered: the agent's answer when there is one
+                agent_result = state.get("agent_result")
+                agent = agent_result["agent"] if agent_result and agent_result["success"] else None
+                delivered = agent_result["content"] if agent else content
+                on_broadcast = lambda tx_hash, wallet_id: state["payment_callback"]({
+                    "tx_hash": tx_hash, "wallet_id": wallet_id, "cost": cost, "tokens": tokens,
+                    "content": delivered, "agent": agent
+                })
+            transfer, wallet = self._pay(
+                state, cost, wallet=wallet, deadline=None if budget else deadline, on_broadcast=on_broadcast
+            )
+            charged = cost
             
+            metrics.wallet_id = wallet.id
             metrics.tokens_used = tokens
             metrics.cost_usdc = cost
             metrics.status = "paid"
             
             return {
-                **state,
                 "tx_hash": transfer.transaction_hash,
                 "token_usage": tokens,
                 "calculated_cost": cost,
                 "metrics": metrics,
-                "initial_response": response.content,
+                "initial_response": content,
                 "payment_verified": None
             }
+        except PaymentPending as e:
+            # The money has moved; keep the tx hash so the transfer can be reconciled
+            charged = cost
+            metrics.status = "payment_pending"
+            metrics.error = str(e)
+            metrics.wallet_id = e.wallet.id
+            metrics.tokens_used = tokens
+            metrics.cost_usdc = cost
+            return {"error": f"Payment pending: {str(e)}", "tx_hash": e.tx_hash, "metrics": metrics}
+        except DeadlineExceeded as e:
+            # Failure handling logs the timeout once the graph routes there
+            metrics.status = "timeout"
+            metrics.error = str(e)
+            return {"error": f"Timed out: {str(e)}", "metrics": metrics}
         except Exception as e:
             metrics.status = "failed"
             metrics.error = str(e)
-            MonitoringDashboard.log_transaction("failed_tx", metrics)
-            return {"error": f"Payment failed: {str(e)}"}
\ No newline at end of file
+            MonitoringDashboard.log_transaction(None, metrics)
+            return {"error": f"Payment failed: {str(e)}"}
+        finally:
+            # Release the streaming budget reserved on a pooled wallet
+            if reserved and state.get("consumer_pool"):
+                state["consumer_pool"].release(wallet, budget, charged=charged)
+    
+    def _generate(self, state, metrics, deadline):
+        """Run inference, on the routed tier and escalating low-confidence answers if routing"""
+        tier = state.get("route_tier")
+        routed = self.router is not None and tier is not None
+        
+        while True:
+            llm = self.router.get_llm(tier) if routed else self.llm
+            model = self.router.tiers[tier].get('model') if routed else getattr(llm, "model_name", None)
+            
+            with Tracer.span("llm.invoke", model=model) as span:
+                response = invoke_with_deadline(llm, deadline, "inference", state["data_request"])
+                tokens = response.response_metadata['token_usage']['completion_tokens']
+                span.set(completion_tokens=tokens)
+            
+            if not routed:
+                return response, tokens
+            
+            metrics.tier = self.router.tier_name(tier)
+            metrics.model = model
+            if not self.router.should_escalate(tier, response.content):
+                return response, tokens
+            
+            # Only the final answer is delivered and charged for
+            tier += 1
+            print(f"Low-confidence answer from {metrics.tier} tier, escalating to {self.router.tier_name(tier)}...")
+    
+    def _generate_metered(self, state, metrics, budget):
+        """Stream the response in chunks until it completes, the budget runs out or it is cancelled"""
+        tier = state.get("route_tier")
+        if self.router is not None and tier is not None:
+            llm = self.router.get_llm(tier)
+            metrics.tier = self.router.tier_name(tier)
+            metrics.model = self.router.tiers[tier].get('model')
+        else:
+            llm = self.llm
+        stream = MeteredStream(
+            llm,
+            budget,
+            chunk_tokens=state.get("stream_chunk_tokens") or 32,
+            on_chunk=state.get("stream_callback"),
+            cancel_event=state.get("stream_cancel"),
+            deadline=state.get("deadline")
+        )
+        
+        with Tracer.span("llm.stream", model=metrics.model or getattr(llm, "model_name", None), budget=budget) as span:
+            result = stream.run(state["data_request"])
+            span.set(tokens=result["tokens"], stop_reason=result["stop_reason"])
+        
+        metrics.stop_reason = result["stop_reason"]
+        print(f"\nStream stopped ({result['stop_reason']}) after ~{result['tokens']} tokens")
+        return result["content"], result["tokens"]
+    
+    @staticmethod
+    def _authorize(state, budget):
+        """Reserve a streaming budget on a consumer wallet before generation starts"""
+        pool = state.get("consumer_pool")
+        if not pool:
+            raise RuntimeError("Metered streaming needs a consumer wallet pool to reserve its budget on")
+        return pool.acquire(budget)
+    
+    @staticmethod
+    @Tracer.traced("WalletManager.transfer")
+    def _pay(state, cost, wallet=None, deadline=None, on_broadcast=None):
+        """Transfer cost to the provider from the given wallet, a pooled wallet, or the single consumer wallet.
+        
+        The deadline is checked once, before the transfer is broadcast. After
+        that the transfer is never abandoned: confirmation is awaited for the
+        remaining time, and PaymentPending carries the tx hash if it runs out.
+        on_broadcast(tx_hash, wallet_id) is called as soon as the money has moved.
+        """
+        if deadline:
+            deadline.check("payment")
+        
+        pool = state.get("consumer_pool") if wallet is None else None
+        if wallet is None:
+            wallet = pool.acquire(cost) if pool else WalletRegistry.get(state["consumer_wallet_id"])
+        provider_wallet = WalletRegistry.get(state["provider_wallet_id"])
+        spent = False
+        try:
+            transfer = wallet.transfer(
+                amount=cost,
+                asset_id=WalletSettings.ASSET_ID,
+                destination=provider_wallet,
+                gasless=WalletSettings.GASLESS
+            )
+            spent = True
+            Tracer.annotate(wallet_id=wallet.id, amount=cost, tx_hash=transfer.transaction_hash)
+            if on_broadcast:
+                try:
+                    on_broadcast(transfer.transaction_hash, wallet.id)
+                except Exception as e:
+                    print(f"Warning: Could not record payment {transfer.transaction_hash}: {str(e)}")
+            
+            try:
+                if deadline:
+                    transfer.wait(timeout_seconds=deadline.remaining())
+                else:
+                    transfer.wait()
+            except TimeoutError:
+                raise PaymentPending(
+                    f"Transfer {transfer.transaction_hash} not confirmed within the {deadline.timeout}s deadline"
+                    if deadline else f"Transfer {transfer.transaction_hash} not confirmed",
+                    transfer.transaction_hash,
+                    wallet
+                )
+            return transfer, wallet
+        finally:
+            if pool:
+                pool.release(wallet, cost, charged=cost if spent else 0.0)
\ No newline at end of file
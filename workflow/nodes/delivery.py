@@ -14,7 +14,7 @@ class DeliveryNode:
             "tx_hash": state["tx_hash"],
             "token_usage": state["token_usage"],
             "calculated_cost": state["calculated_cost"],
-            "consumer_wallet": state.get("consumer_wallet"),
-            "provider_wallet": state.get("provider_wallet")
+            "consumer_wallet_id": state.get("consumer_wallet_id"),
+            "provider_wallet_id": state.get("provider_wallet_id")
         }
         return result
\ No newline at end of file
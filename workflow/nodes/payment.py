@@ -4,10 +4,16 @@ class PaymentNode:
     @staticmethod
     def verify(state: AgentState) -> AgentState:
         """Verify payment node"""
+        if state["metrics"].status == "payment_pending":
+            # Broadcast but unconfirmed: not delivered, but logged under its tx hash
+            return {"payment_verified": False, "error": state.get("error")}
+        
         if not state.get("tx_hash"):
-            state["metrics"].status = "failed"
-            state["metrics"].error = "Missing transaction hash"
-            return {"payment_verified": False, "error": "No transaction hash"}
+            # Keep a timeout or cancellation from the consumer step distinct from a failure
+            if state["metrics"].status not in ("timeout", "cancelled"):
+                state["metrics"].status = "failed"
+                state["metrics"].error = "Missing transaction hash"
+            return {"payment_verified": False, "error": state.get("error") or "No transaction hash"}
         
         print("Payment verified!")
         state["metrics"].status = "verified"
@@ -18,9 +24,10 @@ class PaymentNode:
         """Handle payment failure node"""
         from core.metrics.reporting import MonitoringDashboard
         
-        state["metrics"].status = "failed"
+        if state["metrics"].status not in ("timeout", "cancelled", "payment_pending"):
+            state["metrics"].status = "failed"
         MonitoringDashboard.log_transaction(
-            state.get("tx_hash", "failed_tx"),
+            state.get("tx_hash"),
             state["metrics"]
         )
         return {"error": state.get("error", "Payment failed")}
\ No newline at end of file
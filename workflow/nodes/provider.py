@@ -13,7 +13,7 @@ class ProviderNode:
             print("Processing response...")
             
             # Check if an agent has already processed the query
-            if "agent_result" in state and state["agent_result"]["success"]:
+            if state.get("agent_result") and state["agent_result"]["success"]:
                 print("Using pre-processed agent result...")
                 agent_result = state["agent_result"]
                 
@@ -27,17 +27,17 @@ class ProviderNode:
                 state["calculated_cost"] = 0.002  # Fixed cost for agent processing
                 
                 return {
-                    **state,
                     "data": {"content": agent_result["content"]},
+                    "initial_response": None,
                     "token_usage": state["token_usage"],
                     "calculated_cost": state["calculated_cost"]
                 }
             else:
-                # Standard LLM processing without agent
+                # Standard LLM processing without agent; the response now lives only in data
                 state["metrics"].status = "processed"
                 return {
-                    **state,
                     "data": {"content": state["initial_response"]},
+                    "initial_response": None,
                     "token_usage": state["token_usage"],
                     "calculated_cost": state["calculated_cost"]
                 }
@@ -7,9 +7,19 @@ class AgentState(TypedDict):
     payment_verified: Optional[bool]
     data: Optional[dict]
     error: Optional[str]
-    consumer_wallet: Optional[object]
-    provider_wallet: Optional[object]
+    consumer_wallet_id: Optional[str]  # Resolved through WalletRegistry
+    provider_wallet_id: Optional[str]
+    consumer_pool: Optional[object]
     token_usage: Optional[int]
     calculated_cost: Optional[float]
     metrics: Optional[PerformanceMetrics]
-    initial_response: Optional[str]
\ No newline at end of file
+    initial_response: Optional[str]
+    deadline: Optional[object]
+    route_tier: Optional[int]
+    stream_budget: Optional[float]
+    stream_chunk_tokens: Optional[int]
+    stream_callback: Optional[object]
+    stream_cancel: Optional[object]
+    prepared_response: Optional[dict]
+    agent_result: Optional[dict]
+    payment_callback: Optional[object]  # Called with the payment once a transfer is broadcast
\ No newline at end of file